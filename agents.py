@@ -1,25 +1,70 @@
 import re
 import json
-import io
-import PyPDF2
+import os
+import copy
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+import openai
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 # from langchain.chains import RetrievalQA
 from langchain.chains.retrieval_qa.base import RetrievalQA
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+from langchain_core.messages import SystemMessage, HumanMessage
 # from langchain.vectorstores import FAISS
 from langchain_community.vectorstores import FAISS
+from config import EMBEDDING_MODEL, TAXONOMY_DIR
+from taxonomy import SkillTaxonomy
+from lexical import LexicalIndex
+from extraction import iter_pdf_pages, DocumentTooLargeError
+from candidates import CandidateIndex
+from chunking import split_resume, SectionRetriever, EVIDENCE_SECTIONS
+from results import ResultStore, requirements_key
+from metrics import REGISTRY, MetricsCallbackHandler, TimedEmbeddings, trace
+from prompting import count_tokens, build_context, index_chunks
+from cache import (EmbeddingCache, CachedEmbeddings, LLMResponseCache, StageCache, VectorStoreCache,
+                   content_hash, file_content_hash)
 
 
+ANALYSIS_FAILED = "Analysis failed."
 
 
+def analysis_failed(result):
+    """True if any skill in an analysis result could not be scored (e.g. the LLM was down)"""
+    return ANALYSIS_FAILED in (result.get("skill_reasoning") or {}).values()
 
-class ResumeAnalysisAgent:
-    def __init__(self, api_key, model_name="gpt-4o", base_url=None, cutoff_score=75):
-        self.api_key = api_key.strip()
-        self.model_name = model_name
-        self.base_url = base_url
-        self.cutoff_score = cutoff_score
+# Bump when chunking changes, so indexes stored on disk are rebuilt
+INDEX_FORMAT = 3
+
+# Skill evidence comes from any section except the name/contact header
+EVIDENCE_FILTER = {"section": EVIDENCE_SECTIONS}
+
+# Resume tokens each prompt may carry; longer resumes are reduced to their most relevant chunks
+PROMPT_BUDGETS = {"weaknesses": 600, "improve": 800, "questions": 600, "rewrite": 3000, "prefix": 3000}
+
+PREFIX_INSTRUCTIONS = """You are an expert technical recruiter and resume coach.
+You analyze the candidate resume below against the skills under evaluation.
+Follow the task in the next message exactly, including its output format."""
+
+
+def call_with_retry(fn, *args, max_retries=3, backoff=1.0, **kwargs):
+    """Call fn, retrying with exponential backoff and jitter on rate-limit errors"""
+    for attempt in range(max_retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except openai.RateLimitError:
+            if attempt == max_retries:
+                raise
+            REGISTRY.inc("llm_retries_total")
+            time.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+
+
+class AnalysisContext:
+    """Per-analysis state: everything that belongs to one resume being analyzed"""
 
+    def __init__(self):
         self.resume_text = None
         self.jd_text = None
         self.extracted_skills = []
@@ -27,35 +72,306 @@ class ResumeAnalysisAgent:
         self.analysis_result = None
         self.resume_weaknesses = []
 
+
+def _context_property(name):
+    return property(
+        lambda self: getattr(self.context, name),
+        lambda self, value: setattr(self.context, name, value),
+    )
+
+
+class ResumeAnalysisAgent:
+    # Per-resume state lives on self.context, so one agent's clients and caches can
+    # serve many analyses through bind()
+    resume_text = _context_property("resume_text")
+    jd_text = _context_property("jd_text")
+    extracted_skills = _context_property("extracted_skills")
+    rag_vectorstore = _context_property("rag_vectorstore")
+    analysis_result = _context_property("analysis_result")
+    resume_weaknesses = _context_property("resume_weaknesses")
+
+    def __init__(self, api_key, model_name="gpt-4o", base_url=None, cutoff_score=75, shared_index=True,
+                 max_workers=8, llm_timeout=60, max_retries=3, scoring_mode="parallel",
+                 batch_token_budget=6000, pool_size=20, cache_dir=".cache",
+                 embedding_cache_bytes=256 * 1024 * 1024, llm_cache_ttl=7 * 24 * 3600,
+                 llm_cache_entries=50000, max_pdf_bytes=10 * 1024 * 1024, max_pdf_pages=50,
+                 pdf_workers=4, stage_cache_entries=1024, embedding_model=EMBEDDING_MODEL,
+                 taxonomy_dir=TAXONOMY_DIR, taxonomy_hit_similarity=None, taxonomy_miss_similarity=None,
+                 lexical_prescore=True, lexical_hit_bm25=4.0, lexical_skip_zero_evidence=True,
+                 prompt_budgets=None, shared_prefix=False, candidate_index=True, store_results=True,
+                 metrics=REGISTRY):
+        self.api_key = api_key.strip()
+        self.model_name = model_name
+        self.base_url = base_url
+        self.cutoff_score = cutoff_score
+        # Score every skill against one chunked index per resume instead of
+        # re-embedding the full resume for each skill
+        self.shared_index = shared_index
+        # Skill scoring engine: concurrent LLM calls, per-call timeout (seconds)
+        # and retries with backoff on rate-limit errors
+        self.max_workers = max_workers
+        self.llm_timeout = llm_timeout
+        self.max_retries = max_retries
+        # "parallel": one retrieval QA call per skill
+        # "batch": all skills plus their retrieved evidence in as few JSON calls
+        #          as batch_token_budget allows
+        self.scoring_mode = scoring_mode
+        self.batch_token_budget = batch_token_budget
+        # LLM / embedding clients are cached per configuration and share one
+        # keep-alive HTTP connection pool of pool_size connections
+        self.pool_size = pool_size
+        self._http_client = None
+        self._llm_clients = {}
+        self._embeddings = None
+        self._clients_lock = threading.Lock()
+        # Stage timings, LLM/embedding call latency, tokens, cache hits and retries
+        self.metrics = metrics
+        self.metrics_handler = MetricsCallbackHandler(metrics)
+        # Persistent caches live under cache_dir; None disables them
+        self.cache_dir = cache_dir
+        self.embedding_cache = None
+        self.llm_cache = None
+        self.result_store = None
+        self.index_cache = None
+        if cache_dir:
+            self.embedding_cache = EmbeddingCache(
+                os.path.join(cache_dir, "embeddings.sqlite"),
+                max_bytes=embedding_cache_bytes,
+            )
+            self.llm_cache = LLMResponseCache(
+                os.path.join(cache_dir, "llm_responses.sqlite"),
+                ttl=llm_cache_ttl,
+                max_entries=llm_cache_entries,
+                metrics=metrics,
+            )
+            # Finished analyses by (resume, requirements, model): re-analyzing returns at once
+            if store_results:
+                self.result_store = ResultStore(os.path.join(cache_dir, "results.sqlite"))
+            # Per-resume indexes, written once and memory-mapped by every later session or worker
+            self.index_cache = VectorStoreCache(os.path.join(cache_dir, "indexes"), metrics=metrics)
+
+        # Upload limits and process-pool size for PDF extraction
+        self.max_pdf_bytes = max_pdf_bytes
+        self.max_pdf_pages = max_pdf_pages
+        self.pdf_workers = pdf_workers
+        # Memoized pipeline stage outputs (extracted text, resume index, JD skills,
+        # per-skill scores and weaknesses) keyed by input hash
+        self.stage_cache = StageCache(max_entries=stage_cache_entries)
+        self.embedding_model = embedding_model
+        # Skills whose embedding similarity to the resume is clearly high or clearly
+        # low are scored locally; only the ambiguous ones go to the LLM. None disables.
+        # Thresholds default to the ones calibrated for the embedding model at build time.
+        # A relative taxonomy_dir lives under cache_dir, next to the other built indexes
+        self.taxonomy_dir = os.path.join(cache_dir, taxonomy_dir) if cache_dir and taxonomy_dir else taxonomy_dir
+        self.taxonomy_hit_similarity = taxonomy_hit_similarity
+        self.taxonomy_miss_similarity = taxonomy_miss_similarity
+        self._taxonomy = None
+        # BM25 pre-pass over the resume text: skills with overwhelming evidence or
+        # no mention at all (including synonyms) skip the LLM
+        self.lexical_prescore = lexical_prescore
+        self.lexical_hit_bm25 = lexical_hit_bm25
+        self.lexical_skip_zero_evidence = lexical_skip_zero_evidence
+        self.prompt_budgets = {**PROMPT_BUDGETS, **(prompt_budgets or {})}
+        # Analysis prompts start with one identical system message (instructions, resume,
+        # skill list) and differ only in a short task suffix, so provider-side prompt
+        # caching reuses the prefix across the calls of an analysis. It sends more prompt
+        # tokens than budgeted excerpts, so only enable it for providers that discount
+        # cached tokens. Skill scoring and Q&A always send retrieved evidence only.
+        self.shared_prefix = shared_prefix
+
+        # Every analyzed resume's chunks are added to one persistent index under
+        # cache_dir, so the whole applicant pool can be shortlisted by skill
+        self.candidate_index = candidate_index and bool(cache_dir)
+        self._candidates = None
+
+        self.context = AnalysisContext()
+
+    def bind(self, context):
+        """Return a view of this agent that works on context, sharing all clients and caches"""
+        # Create lazily-initialized shared resources first so every view sees the same ones
+        self.get_embeddings()
+        self.get_taxonomy()
+        self.get_candidate_index()
+        view = copy.copy(self)
+        view.context = context
+        return view
+
+    def get_http_client(self):
+        """Shared pooled HTTP session used by every LLM and embedding client"""
+        with self._clients_lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ))
+            return self._http_client
+
     def get_llm(self, temperature=0.3, response_format=None, **kwargs):
-        """Centralized LLM factory for consistent configuration"""
+        """Centralized LLM factory for consistent configuration. Clients are cached per configuration"""
+        key = (
+            self.model_name,
+            temperature,
+            json.dumps(response_format, sort_keys=True),
+            tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+        )
+        llm = self._llm_clients.get(key)
+        if llm is not None:
+            return llm
+
         params = {
             "model": self.model_name,
             "api_key": self.api_key,
             "temperature": temperature,
             "max_tokens": 2048,
+            "http_client": self.get_http_client(),
+            "callbacks": [self.metrics_handler],
+            # Streamed responses include token usage, so streaming calls are metered too
+            "stream_usage": True,
         }
         if self.base_url:
             params["base_url"] = self.base_url
         if response_format:
             params["response_format"] = response_format
+        # Zero-temperature calls are deterministic, so identical prompts are served from cache
+        if temperature == 0 and self.llm_cache is not None:
+            params["cache"] = self.llm_cache
+
+        llm = self._create_llm(**params, **kwargs)
+        with self._clients_lock:
+            return self._llm_clients.setdefault(key, llm)
+
+    def _create_llm(self, **params):
+        return ChatOpenAI(**params)
+
+    def _create_embeddings(self):
+        return OpenAIEmbeddings(
+            model=self.embedding_model,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=self.get_http_client(),
+        )
 
-        return ChatOpenAI(**params, **kwargs)
+    def get_embeddings(self):
+        """Cached embeddings client sharing the pooled HTTP session and the on-disk embedding cache"""
+        if self._embeddings is None:
+            # Every call that reaches the model is timed, whether or not the cache is enabled
+            embeddings = TimedEmbeddings(self._create_embeddings(), self.embedding_model, self.metrics)
+            if self.embedding_cache is not None:
+                embeddings = CachedEmbeddings(embeddings, self.embedding_cache, self.embedding_model, self.metrics)
+            with self._clients_lock:
+                if self._embeddings is None:
+                    self._embeddings = embeddings
+        return self._embeddings
+
+    def get_taxonomy(self):
+        """Skill taxonomy index, loaded from taxonomy_dir (or built and saved there) once"""
+        if self._taxonomy is None and self.taxonomy_dir:
+            try:
+                taxonomy = SkillTaxonomy.load_or_build(self.taxonomy_dir, self.get_embeddings(), self.embedding_model)
+            except Exception as e:
+                print(f"Skill taxonomy unavailable: {e}")
+                self.taxonomy_dir = None
+                return None
+            with self._clients_lock:
+                if self._taxonomy is None:
+                    self._taxonomy = taxonomy
+        return self._taxonomy
+
+    def get_candidate_index(self):
+        """Persistent cross-resume CandidateIndex, opened once; None when disabled"""
+        if self._candidates is None and self.candidate_index:
+            index = CandidateIndex(os.path.join(self.cache_dir, "candidates"))
+            with self._clients_lock:
+                if self._candidates is None:
+                    self._candidates = index
+        return self._candidates
+
+    def index_candidate(self, resume_text, vectorstore, name=None, metadata=None):
+        """Add (or replace) a resume's chunks in the candidate index, keyed by its content hash"""
+        candidates = self.get_candidate_index()
+        if candidates is None or vectorstore is None:
+            return
+        index = vectorstore.index
+        texts = [doc.page_content for doc in index_chunks(vectorstore)]
+        try:
+            candidates.add(content_hash(resume_text), texts, index.reconstruct_n(0, index.ntotal),
+                           name=name, metadata=metadata)
+        except Exception as e:
+            print(f"Could not add candidate to index: {e}")
+
+    def find_candidates(self, skills, top_n=50, min_similarity=0.0):
+        """Top candidates across every analyzed resume with evidence for all skills"""
+        candidates = self.get_candidate_index()
+        if candidates is None or not skills:
+            return []
+        query_vectors = self.get_embeddings().embed_documents(list(skills))
+        return candidates.search(list(skills), query_vectors, top_n=top_n, min_similarity=min_similarity)
+
+    def get_lexical_index(self, resume_text):
+        return self.stage_cache.get_or_compute(
+            "lexical", content_hash(resume_text), lambda: LexicalIndex(resume_text)
+        )
+
+    def prescore_skills(self, resume_text, skills):
+        """Score obvious hits and misses locally.
+
+        Returns ({skill: (score, reason)}, {"lexical": n, "taxonomy": m}) for those skills only.
+        """
+        results = {}
+        counts = {"lexical": 0, "taxonomy": 0}
+        if self.lexical_prescore:
+            results.update(self.get_lexical_index(resume_text).prescore(
+                skills, SkillTaxonomy.lexical_aliases, SkillTaxonomy.aliases,
+                self.lexical_hit_bm25, self.lexical_skip_zero_evidence,
+            ))
+            counts["lexical"] = len(results)
+
+        remaining = [skill for skill in skills if skill not in results]
+        taxonomy = self.get_taxonomy() if remaining else None
+        vectorstore = self.get_skill_index(resume_text) if taxonomy is not None else None
+        if vectorstore:
+            # A skill the text mentions by any alias is never a confident miss
+            lexical_index = self.get_lexical_index(resume_text)
+            mentioned = {skill for skill in remaining if lexical_index.evidence(SkillTaxonomy.aliases(skill))[1] > 0}
+            try:
+                semantic = taxonomy.prescore(
+                    remaining, vectorstore, self.get_embeddings(),
+                    self.taxonomy_hit_similarity, self.taxonomy_miss_similarity, mentioned=mentioned,
+                )
+            except Exception as e:
+                print(f"Skill pre-scoring failed: {e}")
+                semantic = {}
+            results.update(semantic)
+            counts["taxonomy"] = len(semantic)
+        return results, counts
+
+    def close(self):
+        """Close the pooled HTTP session and drop cached clients"""
+        with self._clients_lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._llm_clients = {}
+            self._embeddings = None
+            if self._candidates is not None:
+                self._candidates.close()
+            self._candidates = None
+
+    def stream_text_from_pdf(self, pdf_file):
+        """Yield extracted text page by page"""
+        yield from iter_pdf_pages(
+            pdf_file,
+            max_bytes=self.max_pdf_bytes,
+            max_pages=self.max_pdf_pages,
+            workers=self.pdf_workers,
+        )
 
     def extract_text_from_pdf(self, pdf_file):
         try:
-            if hasattr(pdf_file, 'getvalue'):
-                pdf_data = pdf_file.getvalue()
-                reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
-            else:
-                reader = PyPDF2.PdfReader(pdf_file)
-
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            return text.strip()
+            pages = [text for text in self.stream_text_from_pdf(pdf_file) if text]
+            return "\n".join(pages).strip()
+        except DocumentTooLargeError:
+            raise
         except Exception as e:
             print(f"PDF extraction error: {e}")
             return ""
@@ -71,6 +387,14 @@ class ResumeAnalysisAgent:
             print(f"TXT extraction error: {e}")
             return ""
 
+    def extract_text_cached(self, file, file_hash=None):
+        """extract_text_from_file, memoized by content hash. Empty text (the extractors
+        swallow errors and return "") is not memoized, so a failed file can be retried."""
+        return self.stage_cache.get_or_compute(
+            "extract", file_hash or file_content_hash(file), lambda: self.extract_text_from_file(file),
+            keep=lambda text: bool(text.strip()),
+        )
+
     def extract_text_from_file(self, file):
         if file is None:
             return ""
@@ -85,20 +409,31 @@ class ResumeAnalysisAgent:
     def create_rag_vector_store(self, text):
         if not text.strip():
             return None
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        chunks = text_splitter.split_text(text)
-        embeddings = OpenAIEmbeddings(api_key=self.api_key, base_url=self.base_url)
-        return FAISS.from_texts(chunks, embeddings)
+        # Section-tagged, non-overlapping chunks that keep bullets whole
+        return FAISS.from_documents(split_resume(text), self.get_embeddings())
 
     def create_simple_vector_store(self, text):
         if not text.strip():
             return None
-        embeddings = OpenAIEmbeddings(api_key=self.api_key, base_url=self.base_url)
-        return FAISS.from_texts([text], embeddings)
+        return FAISS.from_texts([text], self.get_embeddings(), metadatas=[{"section": "other"}])
+
+    def get_skill_index(self, resume_text):
+        """Return the chunked index for resume_text, building it at most once per resume"""
+        return self.stage_cache.get_or_compute(
+            "index", content_hash(resume_text), lambda: self.load_or_create_index(resume_text)
+        )
+
+    def load_or_create_index(self, resume_text):
+        """Load the resume's index from the on-disk index cache, or build and store it"""
+        if self.index_cache is None:
+            return self.create_rag_vector_store(resume_text)
+        key = content_hash(INDEX_FORMAT, self.embedding_model, resume_text)
+        vectorstore = self.index_cache.get(key, self.get_embeddings())
+        if vectorstore is None:
+            vectorstore = self.create_rag_vector_store(resume_text)
+            if vectorstore is not None:
+                self.index_cache.put(key, vectorstore)
+        return vectorstore
 
     def extract_skills_from_jd(self, jd_text):
         llm = self.get_llm(temperature=0.0, response_format={"type": "json_object"})
@@ -138,21 +473,54 @@ Return only the JSON array:
                     skills.append(skill)
         return skills
 
-    def analyze_skill_presence(self, resume_text, skill):
-        vectorstore = self.create_simple_vector_store(resume_text)
-        if not vectorstore:
-            return 0, "No resume content."
+    def prepare_requirements(self, role_requirements=None, custom_jd=None):
+        """Resolve the skill list once for screening many resumes against the same requirements.
+
+        The JD is parsed here, and the skills and their aliases are embedded into the
+        persistent embedding cache, so each analysis (in any worker sharing cache_dir)
+        only pays for its own resume. Pass the returned skills as role_requirements.
+        """
+        if custom_jd:
+            self.jd_text = self.extract_text_cached(custom_jd)
+            skills = self.stage_cache.get_or_compute(
+                "jd_skills", content_hash(self.jd_text), lambda: self.extract_skills_from_jd(self.jd_text)
+            )
+        elif role_requirements:
+            skills = list(role_requirements)
+        else:
+            raise ValueError("No job requirements provided.")
 
-        retriever = vectorstore.as_retriever()
-        llm = self.get_llm(temperature=0.0)
+        queries = list(dict.fromkeys(alias for skill in skills for alias in SkillTaxonomy.aliases(skill)))
+        if queries:
+            self.get_embeddings().embed_documents(queries)
+        self.get_taxonomy()
+        return skills
+
+    def analyze_skill_presence(self, resume_text, skill, vectorstore=None):
+        if not resume_text.strip():
+            return 0, "No resume content."
+        target = vectorstore or self.create_simple_vector_store(resume_text)
+        try:
+            return call_with_retry(self._score_skill, target, skill, max_retries=self.max_retries)
+        except Exception:
+            return 0, ANALYSIS_FAILED
+
+    def _score_skill(self, vectorstore, skill):
+        retriever = SectionRetriever(vectorstore=vectorstore, k=3, search_filter=EVIDENCE_FILTER)
+        # Retries are handled by call_with_retry, not the OpenAI client
+        llm = self.get_llm(temperature=0.0, timeout=self.llm_timeout, max_retries=0)
         qa_chain = RetrievalQA.from_chain_type(
             llm=llm,
             chain_type="stuff",
             retriever=retriever,
             return_source_documents=False
         )
+        response = qa_chain.invoke({"query": self._skill_score_task(skill)})["result"]
+        return self._parse_skill_score(response)
 
-        query = f"""
+    @staticmethod
+    def _skill_score_task(skill):
+        return f"""
 On a scale of 0–10, how clearly and strongly does the resume demonstrate experience with "{skill}"?
 Rate based on:
 - Explicit mentions
@@ -163,16 +531,116 @@ Respond with ONLY a number from 0 to 10, followed by a brief reason.
 Example: 8 - Multiple projects using React with Redux and TypeScript.
 """
 
-        try:
-            response = qa_chain.invoke({"query": query})["result"]
-            match = re.search(r'^(\d{1,2})', response.strip())
-            score = int(match.group(1)) if match else 0
-            reason = response.strip()[match.end():].strip(" -:.")
-            return min(score, 10), reason or "No clear evidence found."
-        except:
-            return 0, "Analysis failed."
+    @staticmethod
+    def _parse_skill_score(response):
+        match = re.search(r'^(\d{1,2})', response.strip())
+        if not match:
+            return 0, response.strip() or "No clear evidence found."
+        score = int(match.group(1))
+        reason = response.strip()[match.end():].strip(" -:.")
+        return min(score, 10), reason or "No clear evidence found."
+
+    def batch_skill_analysis(self, resume_text, skills, evidence_k=3):
+        """Score all skills in batched JSON-mode calls. Returns {skill: (score, reason)}"""
+        vectorstore = self.get_skill_index(resume_text)
+        if not vectorstore:
+            return {skill: (0, "No resume content.") for skill in skills}
+
+        # One embedding request for all skill queries; chunks shared between
+        # skills are only sent once per batch
+        query_vectors = vectorstore.embeddings.embed_documents(list(skills))
+        chunks = []
+        chunk_ids = {}
+        skill_chunks = {}
+        for skill, vector in zip(skills, query_vectors):
+            skill_chunks[skill] = []
+            docs = (vectorstore.similarity_search_by_vector(vector, k=evidence_k, filter=EVIDENCE_FILTER)
+                    or vectorstore.similarity_search_by_vector(vector, k=evidence_k))
+            for doc in docs:
+                if doc.page_content not in chunk_ids:
+                    chunk_ids[doc.page_content] = len(chunks)
+                    chunks.append(doc.page_content)
+                skill_chunks[skill].append(chunk_ids[doc.page_content])
+
+        batches = []
+        current, current_chunks, current_tokens = [], set(), 0
+        for skill in skills:
+            new_chunks = set(skill_chunks[skill]) - current_chunks
+            cost = sum(count_tokens(chunks[i], self.model_name) for i in new_chunks) + count_tokens(skill) + 20
+            if current and current_tokens + cost > self.batch_token_budget:
+                batches.append(current)
+                current, current_chunks, current_tokens = [], set(), 0
+                new_chunks = set(skill_chunks[skill])
+                cost = sum(count_tokens(chunks[i], self.model_name) for i in new_chunks) + count_tokens(skill) + 20
+            current.append(skill)
+            current_chunks |= new_chunks
+            current_tokens += cost
+        if current:
+            batches.append(current)
+
+        def score_batch(batch):
+            try:
+                return call_with_retry(self._score_skill_batch, batch, chunks, skill_chunks,
+                                       max_retries=self.max_retries)
+            except Exception:
+                return {skill: (0, ANALYSIS_FAILED) for skill in batch}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            for batch_result in executor.map(score_batch, batches):
+                results.update(batch_result)
+            # Skills the model left out of its JSON are scored one at a time
+            omitted = [skill for skill in skills if skill not in results]
+            for skill, result in zip(omitted, executor.map(
+                    lambda skill: self.analyze_skill_presence(resume_text, skill, vectorstore), omitted)):
+                results[skill] = result
+        return results
+
+    def _score_skill_batch(self, batch, chunks, skill_chunks):
+        """{skill: (score, reason)} for the skills the response scored; omitted ones are left out"""
+        used = sorted({i for skill in batch for i in skill_chunks[skill]})
+        evidence = "\n\n".join(f"[{i}]\n{chunks[i]}" for i in used)
+        skill_lines = "\n".join(
+            f"- {skill} (evidence: {', '.join(f'[{i}]' for i in skill_chunks[skill]) or 'none'})"
+            for skill in batch
+        )
+        llm = self.get_llm(temperature=0.0, response_format={"type": "json_object"},
+                           timeout=self.llm_timeout, max_retries=0)
+        prompt = f"""
+For each skill below, rate on a scale of 0–10 how clearly and strongly the resume evidence demonstrates experience with it.
+Rate based on:
+- Explicit mentions
+- Projects or achievements using it
+- Depth of usage described
+
+Resume evidence:
+{evidence}
+
+Skills:
+{skill_lines}
 
-    def semantic_skill_analysis(self, resume_text, skills):
+Return valid JSON only, with every skill above as a key:
+{{"Skill name": {{"score": 8, "reason": "Brief reason"}}}}
+"""
+        response = llm.invoke(prompt)
+        data = json.loads(response.content.strip())
+        by_name = {str(k).strip().lower(): v for k, v in data.items()}
+
+        results = {}
+        for skill in batch:
+            entry = by_name.get(skill.lower())
+            if not isinstance(entry, dict):
+                continue
+            try:
+                score = int(float(entry["score"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            reason = str(entry.get("reason", "")).strip()
+            results[skill] = (max(0, min(score, 10)), reason or "No clear evidence found.")
+        return results
+
+    def semantic_skill_analysis(self, resume_text, skills, progress=None):
+        """Score skills; progress, if given, is called as progress("scoring", done, total)"""
         if not skills:
             return {"overall_score": 0, "selected": False, "reasoning": "No skills defined."}
 
@@ -180,8 +648,49 @@ Example: 8 - Multiple projects using React with Redux and TypeScript.
         skill_reasoning = {}
         total_score = 0
 
+        # Skills already scored for this resume are reused; obvious hits and misses
+        # are scored locally and only the rest go to the LLM
+        text_key = content_hash(resume_text)
+        scored = {}
         for skill in skills:
-            score, reasoning = self.analyze_skill_presence(resume_text, skill)
+            cached = self.stage_cache.get("score", (text_key, self.scoring_mode, skill))
+            if cached is not None:
+                scored[skill] = cached
+        pending = [skill for skill in dict.fromkeys(skills) if skill not in scored]
+
+        new_scores, prescored = self.prescore_skills(resume_text, pending)
+        llm_skipped = len(new_scores)
+        pending = [skill for skill in pending if skill not in new_scores]
+
+        total = len(scored) + len(new_scores) + len(pending)
+        done = total - len(pending)
+        if progress:
+            progress("scoring", done, total)
+
+        if pending and self.scoring_mode == "batch":
+            new_scores.update(self.batch_skill_analysis(resume_text, pending))
+            if progress:
+                progress("scoring", total, total)
+        elif pending:
+            vectorstore = self.get_skill_index(resume_text) if self.shared_index else None
+            # Skills are scored concurrently, so wall-clock time tracks the slowest skill
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                futures = {
+                    executor.submit(self.analyze_skill_presence, resume_text, skill, vectorstore): skill
+                    for skill in pending
+                }
+                for future in as_completed(futures):
+                    new_scores[futures[future]] = future.result()
+                    done += 1
+                    if progress:
+                        progress("scoring", done, total)
+        for skill, result in new_scores.items():
+            if result[1] != ANALYSIS_FAILED:
+                self.stage_cache.put("score", (text_key, self.scoring_mode, skill), result)
+        scored.update(new_scores)
+
+        for skill in skills:
+            score, reasoning = scored[skill]
             skill_scores[skill] = score
             skill_reasoning[skill] = reasoning
             total_score += score
@@ -201,29 +710,89 @@ Example: 8 - Multiple projects using React with Redux and TypeScript.
             "reasoning": f"Scored {len(skills)} required skills. Average proficiency: {avg_score:.1f}/10.",
             "strengths": strengths,
             "missing_skills": missing_skills,
+            "llm_skipped": llm_skipped,
+            "prescored": prescored,
         }
 
-    def analyze_resume_weaknesses(self):
-        weaknesses = []
-        for skill in self.analysis_result.get("missing_skills", []):
-            llm = self.get_llm(temperature=0.3, response_format={"type": "json_object"})
-            prompt = f"""
-Analyze why the resume is weak in demonstrating "{skill}".
+    def resume_context(self, kind, queries=(), resume_text=None):
+        """Resume text for a prompt of the given kind, within its token budget.
+
+        Short resumes are sent whole; long ones are reduced to the chunks most similar
+        to queries (e.g. the skills the prompt is about), kept in document order.
+        """
+        resume_text = self.resume_text if resume_text is None else resume_text
+        budget = self.prompt_budgets[kind]
+        vectorstore = self.rag_vectorstore if resume_text == self.resume_text else None
+        if vectorstore is None and count_tokens(resume_text, self.model_name) > budget:
+            vectorstore = self.get_skill_index(resume_text)
+        context = build_context(resume_text, budget, vectorstore, queries, self.model_name)
+        self.metrics.observe("prompt_context_tokens", count_tokens(context, self.model_name), kind=kind)
+        return context
+
+    def prompt_prefix(self, resume_text=None):
+        """System message every analysis prompt for this resume and skill list starts with.
+
+        Built once and reused verbatim, so all calls of an analysis share a byte-identical
+        prefix that the provider can serve from its prompt cache.
+        """
+        resume_text = self.resume_text if resume_text is None else resume_text
+        skills = tuple(self.extracted_skills or ())
+        return self.stage_cache.get_or_compute(
+            "prefix", (content_hash(resume_text), skills), lambda: SystemMessage(content=f"""{PREFIX_INSTRUCTIONS}
+
+Candidate resume:
+{self.resume_context("prefix", skills, resume_text)}
+
+Skills under evaluation: {', '.join(skills) or 'none specified'}
+""")
+        )
 
-Resume excerpt:
-{self.resume_text[:3000]}
+    def prompt_messages(self, kind, task, queries=()):
+        """Shared prefix plus task, or (with shared_prefix off) a single prompt with a budgeted excerpt"""
+        if self.shared_prefix:
+            return [self.prompt_prefix(), HumanMessage(content=task)]
+        return [HumanMessage(content=f"Resume excerpt:\n{self.resume_context(kind, queries)}\n{task}")]
 
-Return valid JSON only:
-{{
-  "weakness": "One-sentence summary of the issue",
-  "improvement_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"],
-  "example_addition": "One strong bullet point to add"
-}}
-"""
+    def analyze_resume_weaknesses(self):
+        missing_skills = self.analysis_result.get("missing_skills", [])
+        if not missing_skills:
+            self.resume_weaknesses = []
+            return []
 
+        llm = self.get_llm(temperature=0.3, response_format={"type": "json_object"})
+        text_key = content_hash(self.resume_text)
+        analyses = {}
+        for skill in missing_skills:
+            cached = self.stage_cache.get("weakness", (text_key, skill))
+            if cached is not None:
+                analyses[skill] = cached
+        pending = [skill for skill in missing_skills if skill not in analyses]
+
+        # All missing skills in one call; anything the batch response omits is
+        # retried per skill concurrently
+        new_analyses = {}
+        if pending:
             try:
-                response = llm.invoke(prompt)
-                data = json.loads(response.content.strip())
+                new_analyses = call_with_retry(self._analyze_weaknesses_batch, llm, pending,
+                                               max_retries=self.max_retries)
+            except Exception:
+                new_analyses = {}
+
+        remaining = [skill for skill in pending if skill not in new_analyses]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                for skill, data in zip(remaining, executor.map(
+                        lambda skill: self._analyze_weakness(llm, skill), remaining)):
+                    if data is not None:
+                        new_analyses[skill] = data
+        for skill, data in new_analyses.items():
+            self.stage_cache.put("weakness", (text_key, skill), data)
+        analyses.update(new_analyses)
+
+        weaknesses = []
+        for skill in missing_skills:
+            data = analyses.get(skill)
+            if data is not None:
                 weaknesses.append({
                     "skill": skill,
                     "score": self.analysis_result["skill_scores"].get(skill, 0),
@@ -231,7 +800,7 @@ Return valid JSON only:
                     "suggestions": data.get("improvement_suggestions", []),
                     "example": data.get("example_addition", "")
                 })
-            except:
+            else:
                 weaknesses.append({
                     "skill": skill,
                     "score": self.analysis_result["skill_scores"].get(skill, 0),
@@ -242,62 +811,199 @@ Return valid JSON only:
         self.resume_weaknesses = weaknesses
         return weaknesses
 
-    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None):
-        self.resume_text = self.extract_text_from_file(resume_file)
+    def _analyze_weaknesses_batch(self, llm, skills):
+        task = f"""
+Analyze why the resume is weak in demonstrating each of these skills: {json.dumps(skills)}
+
+Return valid JSON only, with every skill above as a key:
+{{
+  "Skill name": {{
+    "weakness": "One-sentence summary of the issue",
+    "improvement_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"],
+    "example_addition": "One strong bullet point to add"
+  }}
+}}
+"""
+        response = llm.invoke(self.prompt_messages("weaknesses", task, skills))
+        data = json.loads(response.content.strip())
+        by_name = {str(k).strip().lower(): v for k, v in data.items() if isinstance(v, dict)}
+        return {skill: by_name[skill.lower()] for skill in skills if skill.lower() in by_name}
+
+    def _analyze_weakness(self, llm, skill):
+        task = f"""
+Analyze why the resume is weak in demonstrating "{skill}".
+
+Return valid JSON only:
+{{
+  "weakness": "One-sentence summary of the issue",
+  "improvement_suggestions": ["Suggestion 1", "Suggestion 2", "Suggestion 3"],
+  "example_addition": "One strong bullet point to add"
+}}
+"""
+        try:
+            response = call_with_retry(llm.invoke, self.prompt_messages("weaknesses", task, [skill]),
+                                       max_retries=self.max_retries)
+            return json.loads(response.content.strip())
+        except Exception:
+            return None
+
+    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None, progress=None):
+        """Run the full analysis. progress, if given, is called as progress(stage, done, total)"""
+        progress = progress or (lambda stage, done=0, total=0: None)
+        timings = {}
+        start = time.perf_counter()
+
+        resume_hash = file_content_hash(resume_file)
+        requirements_hash = requirements_key(role_requirements, file_content_hash(custom_jd) if custom_jd else None)
+        if self.load_stored_result(resume_hash, requirements_hash):
+            timings["total"] = time.perf_counter() - start
+            self.analysis_result["timings"] = {"stored": round(timings["total"], 3)}
+            progress("done")
+            return self.analysis_result
+
+        # Each stage is memoized by the hash of its input, so re-running after a
+        # failure or with another role only redoes the stages whose inputs changed
+        progress("extract")
+        with trace("extract", timings, self.metrics):
+            self.resume_text = self.extract_text_cached(resume_file, resume_hash)
         if not self.resume_text.strip():
             raise ValueError("Could not extract text from resume.")
 
-        self.rag_vectorstore = self.create_rag_vector_store(self.resume_text)
+        progress("index")
+        with trace("index", timings, self.metrics):
+            self.rag_vectorstore = self.get_skill_index(self.resume_text)
 
         if custom_jd:
-            self.jd_text = self.extract_text_from_file(custom_jd)
-            self.extracted_skills = self.extract_skills_from_jd(self.jd_text)
+            progress("jd_skills")
+            with trace("jd_skills", timings, self.metrics):
+                self.jd_text = self.extract_text_cached(custom_jd)
+                self.extracted_skills = self.stage_cache.get_or_compute(
+                    "jd_skills", content_hash(self.jd_text), lambda: self.extract_skills_from_jd(self.jd_text)
+                )
         elif role_requirements:
             self.extracted_skills = role_requirements
         else:
             raise ValueError("No job requirements provided.")
 
-        self.analysis_result = self.semantic_skill_analysis(self.resume_text, self.extracted_skills)
+        with trace("scoring", timings, self.metrics):
+            self.analysis_result = self.semantic_skill_analysis(self.resume_text, self.extracted_skills, progress)
 
         if self.analysis_result["missing_skills"]:
-            self.analyze_resume_weaknesses()
+            progress("weaknesses")
+            with trace("weaknesses", timings, self.metrics):
+                self.analyze_resume_weaknesses()
             self.analysis_result["detailed_weaknesses"] = self.resume_weaknesses
 
+        self.index_candidate(self.resume_text, self.rag_vectorstore, name=getattr(resume_file, "name", None), metadata={
+            "overall_score": self.analysis_result["overall_score"],
+            "selected": self.analysis_result["selected"],
+            "strengths": self.analysis_result["strengths"],
+            "missing_skills": self.analysis_result["missing_skills"],
+        })
+
+        timings["total"] = time.perf_counter() - start
+        self.metrics.observe("analysis_seconds", timings["total"])
+        self.analysis_result["timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        # Like failed skill scores in the stage cache, a partly failed analysis is not
+        # stored, so the resume is scored again on the next run
+        if self.result_store is not None and not analysis_failed(self.analysis_result):
+            self.result_store.put(resume_hash, requirements_hash, self.model_name, self.resume_text,
+                                  self.extracted_skills, self.analysis_result, name=getattr(resume_file, "name", None))
+        progress("done")
         return self.analysis_result
 
+    def load_stored_result(self, resume_hash, requirements_hash):
+        """Restore a finished analysis from the result store into the context; False on a miss"""
+        stored = self.result_store.get(resume_hash, requirements_hash, self.model_name) if self.result_store else None
+        if stored is None:
+            return False
+        self.metrics.inc("result_store_hits_total")
+        result = stored["result"]
+        # The cutoff is an agent setting, so selection is re-evaluated rather than stored
+        result["selected"] = result.get("overall_score", 0) >= self.cutoff_score
+        self.resume_text = stored["resume_text"]
+        self.extracted_skills = stored["skills"]
+        self.resume_weaknesses = result.get("detailed_weaknesses", [])
+        self.analysis_result = result
+        self.rag_vectorstore = self.get_skill_index(self.resume_text)
+        return True
+
+    def list_results(self, min_score=None, max_score=None, limit=100):
+        """Stored analyses for this agent's model, best score first"""
+        if self.result_store is None:
+            return []
+        return self.result_store.list(min_score=min_score, max_score=max_score, model=self.model_name, limit=limit)
+
+    def get_qa_chain(self):
+        """Retrieval QA chain for the analyzed resume, built once per resume and reused"""
+        return self.stage_cache.get_or_compute(
+            "qa_chain", content_hash(self.resume_text), lambda: RetrievalQA.from_chain_type(
+                llm=self.get_llm(temperature=0.2),
+                chain_type="stuff",
+                # Questions about e.g. education or experience only search those sections
+                retriever=SectionRetriever(vectorstore=self.rag_vectorstore, k=3),
+                return_source_documents=False
+            )
+        )
+
     def ask_question(self, question):
         if not self.rag_vectorstore:
             return "Please analyze a resume first."
 
-        retriever = self.rag_vectorstore.as_retriever(search_kwargs={"k": 4})
-        llm = self.get_llm(temperature=0.2)
-        qa_chain = RetrievalQA.from_chain_type(
-            llm=llm,
-            chain_type="stuff",
-            retriever=retriever,
-            return_source_documents=False
-        )
         try:
-            result = qa_chain.invoke({"query": question})
+            result = self.get_qa_chain().invoke({"query": question})
             return result["result"]
         except Exception as e:
             return f"Error answering question: {e}"
 
+    def ask_questions(self, questions):
+        """Answer several questions: one retrieval pass per question, generation runs concurrently"""
+        if not self.rag_vectorstore:
+            return ["Please analyze a resume first."] * len(questions)
+
+        results = self.get_qa_chain().batch(
+            [{"query": question} for question in questions],
+            config={"max_concurrency": max(1, self.max_workers)},
+            return_exceptions=True,
+        )
+        return [
+            f"Error answering question: {result}" if isinstance(result, Exception) else result["result"]
+            for result in results
+        ]
+
+    def stream_answer(self, question):
+        """Like ask_question, but yields the answer token by token"""
+        if not self.rag_vectorstore:
+            yield "Please analyze a resume first."
+            return
+
+        qa_chain = self.get_qa_chain()
+        llm = self.get_llm(temperature=0.2)
+        # Same retriever and "stuff" prompt as the QA chain, so answers match the blocking variant
+        docs = qa_chain.retriever.invoke(question)
+        messages = PROMPT_SELECTOR.get_prompt(llm).format_messages(
+            context="\n\n".join(doc.page_content for doc in docs),
+            question=question,
+        )
+        try:
+            for chunk in llm.stream(messages):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            yield f"Error answering question: {e}"
+
     def generate_interview_questions(self, question_types, difficulty, num_questions):
         if not self.resume_text or not self.extracted_skills:
             return []
 
         llm = self.get_llm(temperature=0.7)
         context = f"""
-Resume Summary:
-{self.resume_text[:2000]}
-
 Key Skills: {', '.join(self.extracted_skills)}
 Strengths: {', '.join(self.analysis_result.get('strengths', []))}
 Weaknesses: {', '.join(self.analysis_result.get('missing_skills', []))}
 """
 
-        prompt = f"""
+        task = f"""
 Generate exactly {num_questions} {difficulty}-level interview questions of these types: {', '.join(question_types)}.
 
 Make them personalized to the candidate's experience.
@@ -312,7 +1018,7 @@ Return valid JSON only:
 """
 
         try:
-            response = llm.invoke(prompt)
+            response = llm.invoke(self.prompt_messages("questions", task, self.extracted_skills))
             content = response.content.strip()
             questions = json.loads(content)
             return [(q["type"], q["question"]) for q in questions[:num_questions]]
@@ -358,18 +1064,16 @@ Return valid JSON only:
         remaining = [a for a in improvement_areas if a not in improvements]
         if remaining:
             llm = self.get_llm(temperature=0.4)
-            prompt = f"""
+            task = f"""
 Provide detailed resume improvement suggestions for: {', '.join(remaining)}
 
 Target Role: {target_role or "General Improvement"}
 
-Resume:
-{self.resume_text[:3000]}
-
 Return valid JSON with area names as keys.
 """
             try:
-                response = llm.invoke(prompt)
+                queries = [target_role, *remaining, *self.extracted_skills]
+                response = llm.invoke(self.prompt_messages("improve", task, queries))
                 data = json.loads(response.content.strip())
                 improvements.update(data)
             except:
@@ -384,10 +1088,7 @@ Return valid JSON with area names as keys.
                 }
         return improvements
 
-    def get_improved_resume(self, target_role="", highlight_skills=""):
-        if not self.resume_text:
-            return "No resume analyzed."
-
+    def _improved_resume_prompt(self, target_role, highlight_skills):
         skills_to_highlight = []
         if highlight_skills.strip():
             if len(highlight_skills) > 100:
@@ -398,19 +1099,15 @@ Return valid JSON with area names as keys.
         if not skills_to_highlight and self.extracted_skills:
             skills_to_highlight = self.extracted_skills
 
-        llm = self.get_llm(temperature=0.7)
         weakness_examples = "\n".join([
             f"Add: {w.get('example', '')}" for w in self.resume_weaknesses if w.get('example')
         ])
 
-        prompt = f"""
-Rewrite this resume to be highly optimized for: {target_role or "the analyzed role"}
+        task = f"""
+Rewrite the resume to be highly optimized for: {target_role or "the analyzed role"}
 
 Prioritize highlighting: {', '.join(skills_to_highlight)}
 
-Original Resume:
-{self.resume_text}
-
 Add strong, quantifiable achievements.
 Use ATS-friendly formatting.
 Address weak areas with specific examples.
@@ -420,9 +1117,33 @@ Examples to include:
 
 Return only the improved resume text in clean, professional format.
 """
+        return self.prompt_messages("rewrite", task, [target_role, *skills_to_highlight])
+
+    def get_improved_resume(self, target_role="", highlight_skills=""):
+        if not self.resume_text:
+            return "No resume analyzed."
+
+        llm = self.get_llm(temperature=0.7)
+        prompt = self._improved_resume_prompt(target_role, highlight_skills)
 
         try:
             response = llm.invoke(prompt)
             return response.content.strip()
         except Exception as e:
-            return f"Error generating improved resume: {e}"
\ No newline at end of file
+            return f"Error generating improved resume: {e}"
+
+    def stream_improved_resume(self, target_role="", highlight_skills=""):
+        """Like get_improved_resume, but yields the rewrite token by token"""
+        if not self.resume_text:
+            yield "No resume analyzed."
+            return
+
+        llm = self.get_llm(temperature=0.7)
+        prompt = self._improved_resume_prompt(target_role, highlight_skills)
+
+        try:
+            for chunk in llm.stream(prompt):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            yield f"Error generating improved resume: {e}"
@@ -1,8 +1,10 @@
 import streamlit as st
-from agents import ResumeAnalysisAgent
+from service import get_service
+from config import MODEL_NAME, BASE_URL, ROLE_REQUIREMENTS
 import ui
 from dotenv import load_dotenv
 import os
+import io
 
 
 load_dotenv()
@@ -15,60 +17,13 @@ st.set_page_config(
 )
 
 
-# LLM model
-MODEL_NAME = "openai/gpt-oss-20b:free"
-BASE_URL = "https://openrouter.ai/api/v1"
-
-# Predefined role requirements
-ROLE_REQUIREMENTS = {
-    "AI/ML Engineer": [
-        "Python", "PyTorch", "TensorFlow", "Machine Learning", "Deep Learning", "MLOps",
-        "Scikit-Learn", "NLP", "Computer Vision", "Reinforcement Learning", "Hugging Face",
-        "Data Engineering", "Feature Engineering", "AutoML"
-    ],
-    "Frontend Engineer": [
-        "HTML", "CSS", "JavaScript", "TypeScript", "React", "Next.js", "Redux", "Tailwind CSS",
-        "Vue.js", "Angular", "REST APIs", "GraphQL", "Webpack", "Vite", "UI/UX Design", "Responsive Design"
-    ],
-    "Backend Engineer": [
-        "Python", "Java", "Node.js", "Express", "Spring Boot", "Django", "Flask", "FastAPI",
-        "REST API", "GraphQL", "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis",
-        "Authentication", "Microservices", "Docker", "API Design"
-    ],
-    "Data Engineer": [
-        "Python", "SQL", "ETL", "Apache Spark", "Hadoop", "Kafka", "Airflow", "Snowflake",
-        "AWS", "Azure", "GCP", "Data Warehousing", "BigQuery", "Data Modeling", "Data Pipelines",
-        "Data Lakes", "Delta Lake", "dbt"
-    ],
-    "DevOps Engineer": [
-        "Linux", "Docker", "Kubernetes", "Jenkins", "CI/CD", "Terraform", "AWS", "Azure",
-        "GCP", "Ansible", "Monitoring", "Grafana", "Prometheus", "Shell Scripting", "Git",
-        "Load Balancing", "Networking", "Automation"
-    ],
-    "Full Stack Developer": [
-        "HTML", "CSS", "JavaScript", "TypeScript", "React", "Node.js", "Express", "Next.js",
-        "MongoDB", "PostgreSQL", "REST API", "GraphQL", "Docker", "Git", "Redux",
-        "Tailwind CSS", "Authentication", "Testing", "CI/CD"
-    ],
-    "Data Scientist": [
-        "Python", "R", "Pandas", "NumPy", "Matplotlib", "Seaborn", "Scikit-Learn", "TensorFlow",
-        "PyTorch", "Machine Learning", "Deep Learning", "Statistics", "NLP", "Computer Vision",
-        "Data Cleaning", "Feature Engineering", "Model Deployment", "MLOps"
-    ],
-    "Data Analyst": [
-        "SQL", "Python", "Excel", "Tableau", "Power BI", "Pandas", "NumPy", "Matplotlib",
-        "Seaborn", "Data Visualization", "Data Cleaning", "Statistics", "Reporting",
-        "Business Intelligence", "ETL", "Dashboards"
-    ]
-}
-
 # Initialize session state
-if 'resume_agent' not in st.session_state:
-    st.session_state.resume_agent = None
 if 'resume_analyzed' not in st.session_state:
     st.session_state.resume_analyzed = False
 if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = None
+if 'analysis_job' not in st.session_state:
+    st.session_state.analysis_job = None
 
 
 # Get API key from .env
@@ -79,21 +34,27 @@ if not api_key:
     st.error("❌ API Key not found!")
     st.stop()
 
-# Initialize agent once (only on first run)
-if st.session_state.resume_agent is None:
-    try:
-        st.session_state.resume_agent = ResumeAnalysisAgent(
-            api_key=api_key,
-            model_name=MODEL_NAME,
-            base_url=BASE_URL
-        )
-        st.success("Connected to model")
-    except Exception as e:
-        st.error(f"Failed to connect to model: {e}")
-        st.stop()
+# One analysis service (clients, caches, skill taxonomy) is shared by every session
+# in the process; a session only keeps its own AnalysisContext
+try:
+    service = get_service(api_key, model_name=MODEL_NAME, base_url=BASE_URL)
+except Exception as e:
+    st.error(f"Failed to connect to model: {e}")
+    st.stop()
+
+if 'analysis_context' not in st.session_state:
+    st.session_state.analysis_context = service.new_context()
+    st.success("Connected to model")
+
+agent = service.agent.bind(st.session_state.analysis_context)
+
 
-agent = st.session_state.resume_agent
 
+def copy_upload(uploaded_file):
+    """Detach an upload from the current script run so a background job can read it"""
+    data = io.BytesIO(uploaded_file.getvalue())
+    data.name = uploaded_file.name
+    return data
 
 
 def analyze_resume(agent, resume_file, role, custom_jd):
@@ -101,20 +62,39 @@ def analyze_resume(agent, resume_file, role, custom_jd):
         st.error("Please upload a resume PDF.")
         return None
 
-    try:
-        with st.spinner("🔍 Analyzing resume... This may take 30–60 seconds."):
-            if custom_jd:
-                result = agent.analyze_resume(resume_file, custom_jd=custom_jd)
-            else:
-                result = agent.analyze_resume(resume_file, role_requirements=ROLE_REQUIREMENTS[role])
+    # The analysis runs as a background job on the shared service; widget
+    # interactions rerun the script without interrupting it
+    st.session_state.analysis_job = service.submit_analysis(
+        agent.context,
+        copy_upload(resume_file),
+        role_requirements=None if custom_jd else ROLE_REQUIREMENTS[role],
+        custom_jd=copy_upload(custom_jd) if custom_jd else None,
+    )
+    st.session_state.resume_analyzed = False
+    st.session_state.analysis_result = None
+    return st.session_state.analysis_job
 
-            st.session_state.resume_analyzed = True
-            st.session_state.analysis_result = result
-            st.success("✅ Resume analysis complete!")
-            return result
-    except Exception as e:
-        st.error(f"❌ Analysis failed: {str(e)}")
-        return None
+
+@st.fragment(run_every=1)
+def analysis_progress():
+    job_id = st.session_state.analysis_job
+    status = service.jobs.status(job_id) if job_id else None
+    if status is None:
+        st.session_state.analysis_job = None
+        return
+
+    if status["status"] in ("queued", "running"):
+        ui.display_job_progress(status)
+        return
+
+    st.session_state.analysis_job = None
+    if status["status"] == "done":
+        st.session_state.resume_analyzed = True
+        st.session_state.analysis_result = service.jobs.result(job_id)
+        st.toast("✅ Resume analysis complete!")
+    else:
+        st.session_state.analysis_error = status["error"]
+    st.rerun()
 
 
 def ask_question(agent, question):
@@ -125,6 +105,20 @@ def ask_question(agent, question):
         return f"Error: {e}"
 
 
+def ask_questions(agent, questions):
+    try:
+        return agent.ask_questions(questions)
+    except Exception as e:
+        return [f"Error: {e}"] * len(questions)
+
+
+def stream_answer(agent, question):
+    try:
+        yield from agent.stream_answer(question)
+    except Exception as e:
+        yield f"Error: {e}"
+
+
 def generate_interview_questions(agent, question_types, difficulty, num_questions):
     try:
         with st.spinner("Generating personalized questions..."):
@@ -152,6 +146,13 @@ def get_improved_resume(agent, target_role, highlight_skills):
         return "Failed to generate improved resume."
 
 
+def stream_improved_resume(agent, target_role, highlight_skills):
+    try:
+        yield from agent.stream_improved_resume(target_role, highlight_skills)
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+
 
 
 def main():
@@ -180,6 +181,11 @@ def main():
                 else:
                     st.warning("Please upload a valid PDF resume first.")
 
+        if st.session_state.analysis_job:
+            analysis_progress()
+        if st.session_state.get("analysis_error"):
+            st.error(f"❌ Analysis failed: {st.session_state.pop('analysis_error')}")
+
         if st.session_state.analysis_result:
             st.markdown("---")
             ui.display_analysis_result(st.session_state.analysis_result)
@@ -188,7 +194,9 @@ def main():
     with tabs[1]:
         ui.resume_qa_selection(
             has_resume=st.session_state.resume_analyzed,
-            ask_question_func=lambda q: ask_question(agent, q)
+            ask_question_func=lambda q: ask_question(agent, q),
+            stream_question_func=lambda q: stream_answer(agent, q),
+            ask_questions_func=lambda qs: ask_questions(agent, qs)
         )
 
     # Tab 3: Interview Questions
@@ -209,7 +217,8 @@ def main():
     with tabs[4]:
         ui.improved_resume_section(
             has_resume=st.session_state.resume_analyzed,
-            get_improved_resume_func=lambda role, skills: get_improved_resume(agent, role, skills)
+            get_improved_resume_func=lambda role, skills: get_improved_resume(agent, role, skills),
+            stream_improved_resume_func=lambda role, skills: stream_improved_resume(agent, role, skills)
         )
 
         
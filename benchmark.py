@@ -0,0 +1,352 @@
+"""Offline benchmark of ResumeAnalysisAgent.analyze_resume.
+
+Runs the full pipeline over a synthetic corpus of resumes and job descriptions with a
+local stand-in for ChatOpenAI and OpenAIEmbeddings (configurable latency, deterministic
+outputs), so no API key or network access is needed.
+
+Examples:
+    python benchmark.py --resumes 50
+    python benchmark.py --resumes 200 --llm-latency 0.3 --scoring-mode batch --json bench.json
+    python benchmark.py --resumes 50 --taxonomy
+"""
+import argparse
+import hashlib
+import io
+import json
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from agents import ResumeAnalysisAgent, AnalysisContext
+from config import ROLE_REQUIREMENTS, TAXONOMY_DIR
+from metrics import MetricsRegistry
+from taxonomy import SkillTaxonomy
+
+STAGES = ["extract", "index", "jd_skills", "scoring", "weaknesses"]
+
+
+def _stable_int(*parts):
+    return int(hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _message_text(message):
+    content = message.content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return content
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatOpenAI that answers every prompt the agent sends"""
+
+    model_name: str = "fake-chat"
+    latency: float = 0.0
+    known_skills: list = []
+    # System prompts already seen, standing in for the provider's prompt-prefix cache
+    prefix_cache: set = set()
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(_message_text(m) for m in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        content = self._respond(prompt)
+        usage = {
+            "prompt_tokens": len(prompt) // 4 + 1,
+            "completion_tokens": len(content) // 4 + 1,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        if messages and messages[0].type == "system":
+            prefix = _message_text(messages[0])
+            if prefix in self.prefix_cache:
+                usage["prompt_tokens_details"]["cached_tokens"] = len(prefix) // 4
+            self.prefix_cache.add(prefix)
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))],
+            llm_output={"token_usage": usage, "model_name": self.model_name},
+        )
+
+    def _score(self, skill, context):
+        """Score from the resume evidence only; the task text always names the skill"""
+        context = re.sub(r"^Skills under evaluation:.*$", "", context, flags=re.MULTILINE)
+        seed = _stable_int(skill, context[:200])
+        if skill.lower() in context.lower():
+            return 6 + seed % 4, f"Resume mentions {skill} in project work."
+        return seed % 4, f"No clear evidence of {skill}."
+
+    def _respond(self, prompt):
+        if "Return a valid JSON array of strings" in prompt:
+            jd = prompt.split("Job Description:", 1)[-1]
+            return json.dumps([s for s in self.known_skills if s.lower() in jd.lower()])
+
+        match = re.search(r'demonstrate experience with "([^"]+)"', prompt)
+        if match:
+            score, reason = self._score(match.group(1), prompt[:match.start()].rsplit("On a scale of", 1)[0])
+            return f"{score} - {reason}"
+
+        if "Resume evidence:" in prompt:
+            skills = re.findall(r"^- (.+?) \(evidence:", prompt, re.MULTILINE)
+            evidence = prompt.split("Resume evidence:", 1)[1].split("\nSkills:\n", 1)[0]
+            return json.dumps({
+                skill: dict(zip(("score", "reason"), self._score(skill, evidence))) for skill in skills
+            })
+
+        weakness = {
+            "weakness": "The resume gives no concrete example.",
+            "improvement_suggestions": ["Add a project that uses it.", "Quantify the impact."],
+            "example_addition": "Built a production service that cut latency by 30%.",
+        }
+        match = re.search(r"demonstrating each of these skills: (\[.*?\])", prompt)
+        if match:
+            return json.dumps({skill: weakness for skill in json.loads(match.group(1))})
+        if "weak in demonstrating" in prompt:
+            return json.dumps(weakness)
+
+        return "The candidate has relevant experience described in the resume."
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings with a configurable per-call latency.
+
+    Known skills and their synonyms map to one concept dimension each, weighted above the
+    hashed bag of other words, and every vector shares a common component. As with real
+    models, unrelated texts are mildly similar and text mentioning a skill (by any alias)
+    is clearly closer to it, so the skill taxonomy pre-pass has real hits and misses.
+    """
+
+    def __init__(self, size=256, latency=0.0, concept_weight=4.0, word_weight=0.5, shared=0.4):
+        self.size = size
+        self.latency = latency
+        self.concept_weight = concept_weight
+        self.word_weight = word_weight
+        self.shared = shared
+        concepts = {}
+        for skill in sorted({s for skills in ROLE_REQUIREMENTS.values() for s in skills}):
+            for alias in SkillTaxonomy.aliases(skill):
+                concepts.setdefault(alias.lower(), skill.lower())
+        self.concepts = concepts
+        self.concept_re = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(alias) for alias in sorted(concepts, key=len, reverse=True)) + r")(?!\w)"
+        )
+
+    def _embed(self, text):
+        text = text.lower()
+        vector = [0.0] * self.size
+        for match in self.concept_re.finditer(text):
+            vector[1 + _stable_int("concept", self.concepts[match.group(1)]) % (self.size - 1)] += self.concept_weight
+        for token in re.findall(r"\w+", self.concept_re.sub(" ", text)):
+            vector[1 + _stable_int(token) % (self.size - 1)] += self.word_weight
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        scale = (1.0 - self.shared ** 2) ** 0.5 / norm
+        vector = [v * scale for v in vector]
+        vector[0] = self.shared
+        return vector
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class BenchmarkAgent(ResumeAnalysisAgent):
+    """ResumeAnalysisAgent wired to the fake LLM and embeddings"""
+
+    def __init__(self, llm_latency=0.0, embedding_latency=0.0, **kwargs):
+        self.llm_latency = llm_latency
+        self.embedding_latency = embedding_latency
+        self.prefix_cache = set()
+        super().__init__(api_key="offline", model_name="fake-chat", **kwargs)
+
+    def _create_llm(self, **params):
+        known_skills = sorted({s for skills in ROLE_REQUIREMENTS.values() for s in skills})
+        return FakeChatModel(
+            latency=self.llm_latency,
+            known_skills=known_skills,
+            prefix_cache=self.prefix_cache,
+            cache=params.get("cache"),
+            callbacks=params.get("callbacks"),
+        )
+
+    def _create_embeddings(self):
+        return FakeEmbeddings(latency=self.embedding_latency)
+
+
+def _named_file(text, name):
+    data = io.BytesIO(text.encode("utf-8"))
+    data.name = name
+    return data
+
+
+def synthetic_corpus(n_resumes, seed=0):
+    """[(resume_file, role, jd_file)] with a reproducible mix of roles and skill coverage"""
+    rng = random.Random(seed)
+    roles = sorted(ROLE_REQUIREMENTS)
+    corpus = []
+    for i in range(n_resumes):
+        role = roles[i % len(roles)]
+        skills = ROLE_REQUIREMENTS[role]
+        owned = rng.sample(skills, rng.randint(len(skills) // 3, len(skills)))
+        lines = [f"Candidate {i}", f"{role}", "", "SUMMARY",
+                 f"Engineer with {rng.randint(1, 15)} years of experience.", "", "SKILLS",
+                 ", ".join(owned), "", "EXPERIENCE"]
+        for j in range(rng.randint(3, 8)):
+            lines.append(f"Company {j} - Senior Engineer")
+            for skill in rng.sample(owned, min(len(owned), 3)):
+                lines.append(f"- Delivered a project using {skill} that improved throughput by {rng.randint(5, 60)}%.")
+        lines += ["", "EDUCATION", "B.Sc. Computer Science"]
+        jd = f"We are hiring a {role}. Required: {', '.join(skills)}. Nice to have: communication."
+        corpus.append((_named_file("\n".join(lines), f"resume_{i}.txt"), role, _named_file(jd, f"jd_{i}.txt")))
+    return corpus
+
+
+def run_benchmark(n_resumes=20, concurrency=1, llm_latency=0.05, embedding_latency=0.01,
+                  use_jd=False, seed=0, cache_dir=None, taxonomy=False, **agent_options):
+    registry = MetricsRegistry()
+    agent = BenchmarkAgent(
+        llm_latency=llm_latency,
+        embedding_latency=embedding_latency,
+        cache_dir=cache_dir or tempfile.mkdtemp(prefix="bench-cache-"),
+        # The skill taxonomy is built from the fake embeddings, under the benchmark cache_dir
+        taxonomy_dir=TAXONOMY_DIR if taxonomy else None,
+        metrics=registry,
+        **agent_options,
+    )
+    corpus = synthetic_corpus(n_resumes, seed)
+    latencies = []
+    prescored = {"lexical": 0, "taxonomy": 0}
+    lock = threading.Lock()
+
+    def analyze(item):
+        resume_file, role, jd_file = item
+        view = agent.bind(AnalysisContext())
+        start = time.perf_counter()
+        if use_jd:
+            result = view.analyze_resume(resume_file, custom_jd=jd_file)
+        else:
+            result = view.analyze_resume(resume_file, role_requirements=ROLE_REQUIREMENTS[role])
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            for source, count in (result or {}).get("prescored", {}).items():
+                prescored[source] = prescored.get(source, 0) + count
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        list(executor.map(analyze, corpus))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    agent.close()
+
+    latencies.sort()
+    report = {
+        "resumes": n_resumes,
+        "concurrency": concurrency,
+        "wall_seconds": elapsed,
+        "throughput_per_second": n_resumes / elapsed if elapsed else 0.0,
+        "latency_p50": latencies[int(0.50 * (len(latencies) - 1))] if latencies else 0.0,
+        "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        "peak_memory_bytes": peak,
+        "llm_calls": registry.counter("llm_calls_total", model="fake-chat"),
+        "llm_cache_hits": registry.counter("llm_cache_hits_total"),
+        "prompt_tokens": registry.counter("llm_prompt_tokens_total", model="fake-chat"),
+        "completion_tokens": registry.counter("llm_completion_tokens_total", model="fake-chat"),
+        "cached_prompt_tokens": registry.counter("llm_cached_prompt_tokens_total", model="fake-chat"),
+        "cached_token_ratio": registry.cached_token_ratio(model="fake-chat"),
+        "embedded_texts": registry.counter("embedding_texts_total", model=agent.embedding_model),
+        "prescored_skills": prescored,
+        "stages": {},
+    }
+    for stage in STAGES:
+        timing = registry.summary("stage_seconds", stage=stage)
+        if timing["count"]:
+            report["stages"][stage] = {
+                "count": timing["count"],
+                "p50": timing["p50"],
+                "p95": timing["p95"],
+                "peak_memory_bytes": registry.summary("stage_peak_bytes", stage=stage)["max"],
+            }
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"Resumes:       {report['resumes']} (concurrency {report['concurrency']})",
+        f"Wall time:     {report['wall_seconds']:.2f}s",
+        f"Throughput:    {report['throughput_per_second']:.2f} resumes/s",
+        f"Latency:       p50 {report['latency_p50']:.3f}s  p95 {report['latency_p95']:.3f}s",
+        f"LLM calls:     {report['llm_calls']:.0f} ({report['llm_cache_hits']:.0f} cache hits)",
+        f"Tokens:        {report['prompt_tokens']:.0f} prompt / {report['completion_tokens']:.0f} completion",
+        f"Prompt cache:  {report['cached_prompt_tokens']:.0f} tokens ({report['cached_token_ratio']:.0%} of prompt)",
+        f"Embedded:      {report['embedded_texts']:.0f} texts",
+        f"Pre-scored:    {report['prescored_skills']['lexical']} lexical / "
+        f"{report['prescored_skills']['taxonomy']} taxonomy skills (no LLM call)",
+        f"Peak memory:   {report['peak_memory_bytes'] / 1024 / 1024:.1f} MB",
+        "",
+        f"{'Stage':<12}{'count':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'peak MB':>10}",
+    ]
+    for stage, stats in report["stages"].items():
+        lines.append(
+            f"{stage:<12}{stats['count']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+            f"{stats['peak_memory_bytes'] / 1024 / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the resume analysis pipeline.")
+    parser.add_argument("--resumes", type=int, default=20, help="Number of synthetic resumes")
+    parser.add_argument("--concurrency", type=int, default=1, help="Resumes analyzed in parallel")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--embedding-latency", type=float, default=0.01, help="Seconds per fake embedding call")
+    parser.add_argument("--scoring-mode", choices=["parallel", "batch"], default="parallel")
+    parser.add_argument("--shared-prefix", action="store_true",
+                        help="Start follow-up prompts with the shared resume prefix instead of budgeted excerpts")
+    parser.add_argument("--taxonomy", action="store_true",
+                        help="Build the skill taxonomy from the fake embeddings and use its pre-pass")
+    parser.add_argument("--jd", action="store_true", help="Use synthetic job descriptions instead of predefined roles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        n_resumes=args.resumes,
+        concurrency=args.concurrency,
+        llm_latency=args.llm_latency,
+        embedding_latency=args.embedding_latency,
+        use_jd=args.jd,
+        seed=args.seed,
+        scoring_mode=args.scoring_mode,
+        shared_prefix=args.shared_prefix,
+        taxonomy=args.taxonomy,
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.caches import BaseCache
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+from metrics import REGISTRY
+
+
+def content_hash(*parts):
+    """Stable sha256 hex digest of the given string parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_content_hash(file):
+    """Hash the bytes of an uploaded file or file object without moving its read position"""
+    if hasattr(file, "getvalue"):
+        return hashlib.sha256(file.getvalue()).hexdigest()
+    position = file.tell()
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(1 << 20), b""):
+        digest.update(block if isinstance(block, bytes) else block.encode("utf-8"))
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def open_sqlite(path):
+    """Open a SQLite database shared between threads (and processes, via WAL)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class EmbeddingCache:
+    """Disk-backed embedding store keyed by hash(model, text) with size-based LRU eviction"""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)")
+        self._conn.commit()
+
+    def get_many(self, model, texts):
+        """Return a list aligned with texts holding cached vectors or None"""
+        keys = [content_hash(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def put_many(self, model, texts, vectors):
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((content_hash(model, text), blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, accessed) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM embeddings ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends texts missing from the cache to the underlying model"""
+
+    def __init__(self, embeddings, cache, model_name, metrics=REGISTRY):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+        self.metrics = metrics
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.metrics.inc("embedding_cache_hits_total", len(texts) - len(missing))
+        self.metrics.inc("embedding_cache_misses_total", len(missing))
+        if missing:
+            # Duplicate texts within one call are only embedded once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            computed = dict(zip(unique, self.embeddings.embed_documents(unique)))
+            self.cache.put_many(self.model_name, unique, [computed[t] for t in unique])
+            for i in missing:
+                vectors[i] = computed[texts[i]]
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class LLMResponseCache(BaseCache):
+    """Persistent response cache for deterministic LLM calls with TTL, size limit and hit/miss counters.
+
+    Entries are keyed by hash(model + parameters, prompt), where LangChain's llm_string
+    carries the model name and every generation parameter.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=50000, metrics=REGISTRY):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                generations TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def lookup(self, prompt, llm_string):
+        key = content_hash(llm_string, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generations, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                self.misses += 1
+                self.metrics.inc("llm_cache_misses_total")
+                return None
+            self.hits += 1
+            self.metrics.inc("llm_cache_hits_total")
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        generations = []
+        for g in json.loads(row[0]):
+            # Marked as cached, so metrics can tell them from provider calls
+            info = {**(g.get("info") or {}), "cached": True}
+            generations.append(ChatGeneration(message=AIMessage(content=g["text"]), generation_info=info)
+                               if g.get("chat") else Generation(text=g["text"], generation_info=info))
+        return generations
+
+    def update(self, prompt, llm_string, return_val):
+        generations = json.dumps([
+            {"text": g.text, "info": g.generation_info, "chat": isinstance(g, ChatGeneration)}
+            for g in return_val
+        ])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, generations, created, accessed) VALUES (?, ?, ?, ?)",
+                (content_hash(llm_string, prompt), generations, now, now),
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class StageCache:
+    """Thread-safe in-memory LRU of pipeline stage outputs keyed by (stage, input hash)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, stage, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end((stage, key))
+                return self._entries[(stage, key)]
+            except KeyError:
+                return default
+
+    def put(self, stage, key, value):
+        with self._lock:
+            self._entries[(stage, key)] = value
+            self._entries.move_to_end((stage, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, stage, key, compute, keep=None):
+        """Return the memoized output of stage for key, running compute() on a miss.
+        Failures are not memoized, so a re-run resumes from the last completed stage;
+        neither are outputs that keep(value), if given, rejects."""
+        missing = object()
+        value = self.get(stage, key, missing)
+        if value is missing:
+            value = compute()
+            if keep is None or keep(value):
+                self.put(stage, key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class VectorStoreCache:
+    """Per-resume FAISS indexes on disk: index.faiss plus a JSON chunk store per key.
+
+    Flat indexes are memory-mapped read-only where FAISS supports it, so processes that
+    open the same resume share its pages and a load costs no embedding calls. Loaded
+    stores must not be added to.
+    """
+
+    def __init__(self, directory, metrics=REGISTRY):
+        self.directory = directory
+        self.metrics = metrics
+        os.makedirs(directory, exist_ok=True)
+        self._flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, embeddings):
+        """Return the stored FAISS vector store for key, or None"""
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+                chunks = json.load(f)
+            index = faiss.read_index(os.path.join(path, "index.faiss"), self._flags)
+        except (OSError, ValueError, RuntimeError):
+            self.metrics.inc("index_cache_misses_total")
+            return None
+        if index.ntotal != len(chunks):
+            self.metrics.inc("index_cache_misses_total")
+            return None
+        self.metrics.inc("index_cache_hits_total")
+        ids = [str(i) for i in range(len(chunks))]
+        return FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore({
+                doc_id: Document(page_content=chunk["text"], metadata=chunk.get("metadata", {}))
+                for doc_id, chunk in zip(ids, chunks)
+            }),
+            index_to_docstore_id=dict(enumerate(ids)),
+        )
+
+    def put(self, key, vectorstore):
+        """Write a vector store under key; the directory appears atomically"""
+        ids = vectorstore.index_to_docstore_id
+        docs = [vectorstore.docstore.search(ids[i]) for i in range(len(ids))]
+        staging = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            faiss.write_index(vectorstore.index, os.path.join(staging, "index.faiss"))
+            with open(os.path.join(staging, "chunks.json"), "w", encoding="utf-8") as f:
+                json.dump([{"text": doc.page_content, "metadata": doc.metadata} for doc in docs], f)
+            os.replace(staging, self._path(key))
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
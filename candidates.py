@@ -0,0 +1,249 @@
+"""Persistent index of every analyzed resume's chunks, for shortlisting a whole applicant pool.
+
+Query it from the command line with:
+    python candidates.py Kafka Airflow --top 50
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+import faiss
+import numpy as np
+
+from cache import open_sqlite
+
+
+def _normalize(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.size:
+        faiss.normalize_L2(matrix)
+    return matrix
+
+
+class CandidateIndex:
+    """Chunk embeddings of many resumes in one FAISS index, with candidate metadata in SQLite.
+
+    Small pools use an exact inner-product index; once ivf_threshold chunks are stored it
+    is retrained as an IVF index, searched with ivf_nprobe lists. Vectors are kept in
+    SQLite as well, so the index can be rebuilt or retrained without re-embedding. SQLite
+    is the source of truth: an index file that disagrees with it (e.g. last written by
+    another process, or not yet saved) is rebuilt on open.
+
+    The index file is rewritten after save_every changes or save_interval seconds, and on
+    close(); each write goes to a temporary file that atomically replaces the old one.
+    """
+
+    def __init__(self, directory, ivf_threshold=50000, ivf_nprobe=16, save_every=100, save_interval=60.0):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "candidates.faiss")
+        self.ivf_threshold = ivf_threshold
+        self.ivf_nprobe = ivf_nprobe
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(os.path.join(directory, "candidates.sqlite"))
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                candidate_id TEXT PRIMARY KEY,
+                name TEXT,
+                metadata TEXT NOT NULL,
+                added REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                candidate_id TEXT NOT NULL REFERENCES candidates (candidate_id),
+                text TEXT NOT NULL,
+                vector BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_candidate ON chunks (candidate_id);
+        """)
+        self._conn.commit()
+        # chunk id -> candidate id, so ranking never touches SQLite
+        self._owners = dict(self._conn.execute("SELECT chunk_id, candidate_id FROM chunks"))
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                index = faiss.read_index(self.index_path)
+                if index.ntotal == len(self._owners):
+                    self._tune(index)
+                    return index
+            except RuntimeError as e:
+                print(f"Rebuilding candidate index: {e}")
+        return self._build_index(self._all_vectors())
+
+    def _all_vectors(self):
+        rows = self._conn.execute("SELECT chunk_id, vector FROM chunks ORDER BY chunk_id").fetchall()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        vectors = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else None
+        return ids, vectors
+
+    def _build_index(self, data):
+        ids, vectors = data
+        if vectors is None:
+            return None
+        dimension = vectors.shape[1]
+        if len(ids) >= self.ivf_threshold:
+            nlist = int(4 * math.sqrt(len(ids)))
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dimension), dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        index.add_with_ids(vectors, ids)
+        self._tune(index)
+        return index
+
+    def _tune(self, index):
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.ivf_nprobe
+
+    def _changed(self):
+        self._unsaved += 1
+        if self._unsaved >= self.save_every or time.monotonic() - self._last_save >= self.save_interval:
+            self._save()
+
+    def _save(self):
+        if self.index is not None and self._unsaved:
+            fd, staging = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".faiss")
+            os.close(fd)
+            try:
+                faiss.write_index(self.index, staging)
+                os.replace(staging, self.index_path)
+            finally:
+                if os.path.exists(staging):
+                    os.remove(staging)
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+    def flush(self):
+        """Write pending changes to the index file now"""
+        with self._lock:
+            self._save()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def add(self, candidate_id, texts, vectors, name=None, metadata=None):
+        """Store (or replace) a candidate's chunks and their embeddings"""
+        vectors = _normalize(vectors)
+        with self._lock:
+            self._remove(candidate_id)
+            self._conn.execute(
+                "INSERT INTO candidates (candidate_id, name, metadata, added) VALUES (?, ?, ?, ?)",
+                (candidate_id, name, json.dumps(metadata or {}), time.time()),
+            )
+            ids = []
+            for text, vector in zip(texts, vectors):
+                cursor = self._conn.execute(
+                    "INSERT INTO chunks (candidate_id, text, vector) VALUES (?, ?, ?)",
+                    (candidate_id, text, vector.tobytes()),
+                )
+                ids.append(cursor.lastrowid)
+                self._owners[cursor.lastrowid] = candidate_id
+            self._conn.commit()
+
+            if self.index is None or (len(self._owners) >= self.ivf_threshold
+                                      and not isinstance(self.index, faiss.IndexIVF)):
+                self.index = self._build_index(self._all_vectors())
+            elif ids:
+                self.index.add_with_ids(vectors, np.array(ids, dtype=np.int64))
+            self._changed()
+
+    def remove(self, candidate_id):
+        with self._lock:
+            removed = self._remove(candidate_id)
+            self._conn.commit()
+            if removed:
+                self._changed()
+            return removed
+
+    def _remove(self, candidate_id):
+        ids = [row[0] for row in self._conn.execute(
+            "SELECT chunk_id FROM chunks WHERE candidate_id = ?", (candidate_id,))]
+        self._conn.execute("DELETE FROM chunks WHERE candidate_id = ?", (candidate_id,))
+        deleted = self._conn.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,)).rowcount
+        if ids and self.index is not None:
+            self.index.remove_ids(np.array(ids, dtype=np.int64))
+        for chunk_id in ids:
+            self._owners.pop(chunk_id, None)
+        return bool(deleted)
+
+    def get(self, candidate_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, metadata, added FROM candidates WHERE candidate_id = ?", (candidate_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"candidate_id": candidate_id, "name": row[0], "metadata": json.loads(row[1]), "added": row[2]}
+
+    def search(self, skills, query_vectors, top_n=50, min_similarity=0.0, chunks_per_skill=None):
+        """Rank candidates by evidence for all skills.
+
+        Each skill's best chunk similarity per candidate is looked up among its
+        chunks_per_skill nearest chunks; a candidate's score is the mean over skills, so
+        one missing skill pulls it down. Candidates below min_similarity on any skill
+        are dropped. Returns [{candidate_id, name, metadata, score, skills: {skill: similarity}}].
+        """
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0 or not skills:
+                return []
+            k = min(self.index.ntotal, chunks_per_skill or max(200, top_n * 20))
+            similarities, ids = self.index.search(_normalize(query_vectors), k)
+            owners = dict(self._owners)
+
+        best = {}
+        for column, skill in enumerate(skills):
+            for similarity, chunk_id in zip(similarities[column], ids[column]):
+                candidate_id = owners.get(int(chunk_id))
+                if candidate_id is None:
+                    continue
+                per_skill = best.setdefault(candidate_id, {})
+                per_skill[skill] = max(per_skill.get(skill, -1.0), float(similarity))
+
+        ranked = []
+        for candidate_id, per_skill in best.items():
+            scores = [per_skill.get(skill, 0.0) for skill in skills]
+            if min(scores) < min_similarity:
+                continue
+            ranked.append((sum(scores) / len(scores), candidate_id, per_skill))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        results = []
+        for score, candidate_id, per_skill in ranked[:top_n]:
+            entry = self.get(candidate_id) or {"candidate_id": candidate_id, "name": None, "metadata": {}}
+            entry["score"] = score
+            entry["skills"] = {skill: per_skill.get(skill, 0.0) for skill in skills}
+            results.append(entry)
+        return results
+
+    def close(self):
+        with self._lock:
+            self._save()
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from agents import ResumeAnalysisAgent
+    from config import MODEL_NAME, BASE_URL
+
+    parser = argparse.ArgumentParser(description="Shortlist analyzed candidates by skill.")
+    parser.add_argument("skills", nargs="+")
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--min-similarity", type=float, default=0.0)
+    args = parser.parse_args()
+
+    load_dotenv()
+    agent = ResumeAnalysisAgent(api_key=os.getenv("OPENROUTER_API_KEY", ""), model_name=MODEL_NAME, base_url=BASE_URL)
+    for rank, candidate in enumerate(agent.find_candidates(args.skills, args.top, args.min_similarity), 1):
+        skills = ", ".join(f"{skill} {similarity:.2f}" for skill, similarity in candidate["skills"].items())
+        print(f"{rank:>3}. {candidate['score']:.3f}  {candidate['name'] or candidate['candidate_id'][:12]}  ({skills})")
@@ -0,0 +1,188 @@
+"""Resume-structure-aware chunking.
+
+Splits extracted resume text at section headings and roles and keeps bullets whole, so
+each chunk is a dense, non-overlapping piece of one section tagged with metadata
+({"section", "heading", "role"}) that retrieval can filter on.
+"""
+import re
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Canonical section -> headings that introduce it
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "projects": ["projects", "personal projects", "key projects", "selected projects"],
+    "skills": ["skills", "technical skills", "core competencies", "technologies", "tools", "tech stack"],
+    "education": ["education", "academic background", "qualifications", "coursework"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "publications"],
+}
+_HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Text before the first heading (name, contact details) is tagged "header"
+EVIDENCE_SECTIONS = ["summary", "experience", "projects", "skills", "education", "certifications",
+                     "achievements", "other"]
+
+# Sections every question filter includes: skills are often only listed there, and the
+# summary states experience in years
+ALWAYS_SECTIONS = ["skills", "summary"]
+
+# Question words -> the sections a Q&A retrieval is restricted to (plus ALWAYS_SECTIONS)
+QUESTION_SECTIONS = {
+    "experience": ["experience", "projects"],
+    "worked": ["experience", "projects"],
+    "job": ["experience"],
+    "role": ["experience"],
+    "project": ["projects", "experience"],
+    "education": ["education", "certifications"],
+    "degree": ["education"],
+    "university": ["education"],
+    "certification": ["certifications"],
+    "certified": ["certifications"],
+    "skill": ["skills", "experience", "projects"],
+    "award": ["achievements"],
+}
+
+BULLET_RE = re.compile(r"^(?:[-*•●○◦▪■►–—]|\d{1,2}[.)])\s*")
+DATE_RANGE_RE = re.compile(
+    r"\b(?:19|20)\d{2}\b.{0,20}?(?:-|–|—|to)\s*(?:\w+\.?\s+)?(?:(?:19|20)\d{2}\b|present|current|now)",
+    re.IGNORECASE,
+)
+
+
+def _known_section(line):
+    """Canonical section for a known heading line, or None"""
+    key = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    return _HEADING_SECTIONS.get(key)
+
+
+def _is_caps_token(line):
+    return 0 < len(line.split()) <= 4 and bool(re.fullmatch(r"[A-Z][A-Z&/ ]*:?", line))
+
+
+def _heading_section(lines, i, section):
+    """Section that lines[i] starts, or None if it is body text.
+
+    Known headings always count. A short all-caps line (e.g. "VOLUNTEERING") only starts
+    an "other" section when its layout says so: after the first known heading, outside
+    the skills list, and not next to other caps tokens (e.g. "AWS" / "SQL" lists).
+    """
+    known = _known_section(lines[i])
+    if known:
+        return known
+    if section == "header" or section == "skills" or not _is_caps_token(lines[i]):
+        return None
+    if i == 0 or i + 1 >= len(lines) or _is_caps_token(lines[i - 1]):
+        return None
+    following = lines[i + 1]
+    if _is_caps_token(following) or _known_section(following):
+        return None
+    return "other"
+
+
+def _units(lines):
+    """Group lines into bullets (with their wrapped continuation lines) and plain lines"""
+    units = []
+    in_bullet = False
+    for line in lines:
+        if BULLET_RE.match(line):
+            units.append(line)
+            in_bullet = True
+        elif in_bullet and line[:1].islower():
+            units[-1] += " " + line
+        else:
+            units.append(line)
+            in_bullet = False
+    return units
+
+
+def _split_long(unit, max_chars):
+    if len(unit) <= max_chars:
+        return [unit]
+    pieces, current = [], ""
+    for sentence in re.split(r"(?<=[.;!?])\s+", unit):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_resume(text, max_chars=800):
+    """Split resume text into section-tagged Documents of at most ~max_chars, without overlap"""
+    groups = []  # (section, heading, role, lines)
+    section, heading, role, lines = "header", None, None, []
+    all_lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for i, line in enumerate(all_lines):
+        new_section = _heading_section(all_lines, i, section)
+        if new_section:
+            groups.append((section, heading, role, lines))
+            section, heading, role, lines = new_section, line.rstrip(":"), None, []
+        elif section in ("experience", "projects") and not BULLET_RE.match(line) and DATE_RANGE_RE.search(line):
+            groups.append((section, heading, role, lines))
+            role, lines = line, []
+        else:
+            lines.append(line)
+    groups.append((section, heading, role, lines))
+    if len(groups) == 1:
+        # No headings found: nothing is known to be contact details only
+        groups = [("other", None, role, lines)]
+
+    docs = []
+    for section, heading, role, lines in groups:
+        if not lines and not role:
+            continue
+        # Each chunk repeats its heading and role, so it stands on its own when retrieved
+        title = "\n".join(part for part in (heading, role) if part)
+        budget = max(100, max_chars - len(title))
+        metadata = {"section": section, "heading": heading, "role": role}
+        current = []
+        for unit in (piece for unit in _units(lines) for piece in _split_long(unit, budget)):
+            if current and sum(len(u) + 1 for u in current) + len(unit) > budget:
+                docs.append(Document(page_content="\n".join([title] + current).strip(), metadata=dict(metadata)))
+                current = []
+            current.append(unit)
+        if current or role:
+            docs.append(Document(page_content="\n".join([title] + current).strip(), metadata=dict(metadata)))
+    return docs
+
+
+def question_filter(question):
+    """Metadata filter for a Q&A question, or None to search the whole resume"""
+    words = set(re.findall(r"[a-z]+", question.lower()))
+    sections = []
+    for word, word_sections in QUESTION_SECTIONS.items():
+        if word in words or word + "s" in words:
+            sections.extend(word_sections)
+    return {"section": list(dict.fromkeys(sections + ALWAYS_SECTIONS))} if sections else None
+
+
+class SectionRetriever(BaseRetriever):
+    """Retrieves from the sections a question is about (or those in search_filter),
+    topping up from the whole resume when they hold fewer than k chunks"""
+
+    vectorstore: object
+    k: int = 3
+    search_filter: dict = None
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        vector = self.vectorstore.embeddings.embed_query(query)
+        search_filter = self.search_filter or question_filter(query)
+        docs = []
+        if search_filter:
+            docs = self.vectorstore.similarity_search_by_vector(vector, k=self.k, filter=search_filter)
+            if len(docs) >= self.k:
+                return docs
+        seen = {doc.page_content for doc in docs}
+        for doc in self.vectorstore.similarity_search_by_vector(vector, k=self.k):
+            if len(docs) < self.k and doc.page_content not in seen:
+                docs.append(doc)
+        return docs
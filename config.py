@@ -0,0 +1,50 @@
+# LLM model
+MODEL_NAME = "openai/gpt-oss-20b:free"
+BASE_URL = "https://openrouter.ai/api/v1"
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Prebuilt skill/synonym embedding index (see taxonomy.py), relative to the agent cache_dir
+TAXONOMY_DIR = "skill_index"
+
+# Predefined role requirements
+ROLE_REQUIREMENTS = {
+    "AI/ML Engineer": [
+        "Python", "PyTorch", "TensorFlow", "Machine Learning", "Deep Learning", "MLOps",
+        "Scikit-Learn", "NLP", "Computer Vision", "Reinforcement Learning", "Hugging Face",
+        "Data Engineering", "Feature Engineering", "AutoML"
+    ],
+    "Frontend Engineer": [
+        "HTML", "CSS", "JavaScript", "TypeScript", "React", "Next.js", "Redux", "Tailwind CSS",
+        "Vue.js", "Angular", "REST APIs", "GraphQL", "Webpack", "Vite", "UI/UX Design", "Responsive Design"
+    ],
+    "Backend Engineer": [
+        "Python", "Java", "Node.js", "Express", "Spring Boot", "Django", "Flask", "FastAPI",
+        "REST API", "GraphQL", "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis",
+        "Authentication", "Microservices", "Docker", "API Design"
+    ],
+    "Data Engineer": [
+        "Python", "SQL", "ETL", "Apache Spark", "Hadoop", "Kafka", "Airflow", "Snowflake",
+        "AWS", "Azure", "GCP", "Data Warehousing", "BigQuery", "Data Modeling", "Data Pipelines",
+        "Data Lakes", "Delta Lake", "dbt"
+    ],
+    "DevOps Engineer": [
+        "Linux", "Docker", "Kubernetes", "Jenkins", "CI/CD", "Terraform", "AWS", "Azure",
+        "GCP", "Ansible", "Monitoring", "Grafana", "Prometheus", "Shell Scripting", "Git",
+        "Load Balancing", "Networking", "Automation"
+    ],
+    "Full Stack Developer": [
+        "HTML", "CSS", "JavaScript", "TypeScript", "React", "Node.js", "Express", "Next.js",
+        "MongoDB", "PostgreSQL", "REST API", "GraphQL", "Docker", "Git", "Redux",
+        "Tailwind CSS", "Authentication", "Testing", "CI/CD"
+    ],
+    "Data Scientist": [
+        "Python", "R", "Pandas", "NumPy", "Matplotlib", "Seaborn", "Scikit-Learn", "TensorFlow",
+        "PyTorch", "Machine Learning", "Deep Learning", "Statistics", "NLP", "Computer Vision",
+        "Data Cleaning", "Feature Engineering", "Model Deployment", "MLOps"
+    ],
+    "Data Analyst": [
+        "SQL", "Python", "Excel", "Tableau", "Power BI", "Pandas", "NumPy", "Matplotlib",
+        "Seaborn", "Data Visualization", "Data Cleaning", "Statistics", "Reporting",
+        "Business Intelligence", "ETL", "Dashboards"
+    ]
+}
@@ -0,0 +1,127 @@
+import atexit
+import io
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured byte limit"""
+
+
+def read_upload_bytes(file, max_bytes):
+    """Read an uploaded file (Streamlit upload, file object or path), refusing anything over max_bytes"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return read_upload_bytes(f, max_bytes)
+
+    size = getattr(file, "size", None)
+    if size is None and hasattr(file, "seek") and hasattr(file, "tell"):
+        position = file.tell()
+        file.seek(0, io.SEEK_END)
+        size = file.tell() - position
+        file.seek(position)
+    if max_bytes and size is not None and size > max_bytes:
+        raise DocumentTooLargeError(
+            f"File is {size / 1024 / 1024:.1f} MB, the limit is {max_bytes / 1024 / 1024:.1f} MB."
+        )
+
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    data = file.read(max_bytes + 1 if max_bytes else -1)
+    if max_bytes and len(data) > max_bytes:
+        raise DocumentTooLargeError(f"File exceeds the {max_bytes / 1024 / 1024:.1f} MB limit.")
+    return data
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _pdf_pool(workers):
+    """Process pool shared by every extraction in this process, started on first use.
+
+    Workers are started by a forkserver (spawn where that is unavailable) instead of
+    fork, so they never inherit the threads and held locks of a running server.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _pool_workers = workers
+        return _pool
+
+
+def _in_streamlit():
+    """True inside `streamlit run`, whose fake __main__ every spawned worker would re-run"""
+    if "streamlit" not in sys.modules:
+        return False
+    from streamlit import runtime
+    return runtime.exists()
+
+
+def shutdown_pdf_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+atexit.register(shutdown_pdf_pool)
+
+
+def extract_page_range(pdf_data, start, stop):
+    """Extract text for pages [start, stop). Runs in worker processes, so it parses its own reader"""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(pdf_file, max_bytes=10 * 1024 * 1024, max_pages=50, workers=4, parallel_threshold=16):
+    """Yield the text of each page in order.
+
+    Only the first max_pages pages are read. Documents with more than parallel_threshold
+    pages are split into page ranges extracted across a long-lived process pool; if the
+    pool has broken, the document is extracted in this process instead. Under Streamlit
+    the pool is never started, since each worker would re-execute the app script.
+    """
+    pdf_data = read_upload_bytes(pdf_file, max_bytes)
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
+    num_pages = len(reader.pages)
+    if max_pages and num_pages > max_pages:
+        print(f"PDF has {num_pages} pages, only the first {max_pages} are extracted")
+        num_pages = max_pages
+
+    if workers <= 1 or num_pages <= parallel_threshold or _in_streamlit():
+        for i in range(num_pages):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    step = -(-num_pages // workers)
+    ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+    done = 0
+    futures = []
+    try:
+        pool = _pdf_pool(workers)
+        futures = [pool.submit(extract_page_range, pdf_data, start, stop) for start, stop in ranges]
+        for future in futures:
+            pages = future.result()
+            done += len(pages)
+            yield from pages
+    except (BrokenProcessPool, RuntimeError) as e:
+        print(f"PDF worker pool failed, extracting in-process: {e}")
+        shutdown_pdf_pool()
+        for i in range(done, num_pages):
+            yield reader.pages[i].extract_text() or ""
+    finally:
+        for future in futures:
+            future.cancel()
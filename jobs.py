@@ -0,0 +1,113 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+STAGE_LABELS = {
+    "queued": "Waiting for a free worker",
+    "extract": "Extracting resume text",
+    "index": "Indexing resume",
+    "jd_skills": "Extracting skills from job description",
+    "scoring": "Scoring skills",
+    "weaknesses": "Analyzing weak areas",
+    "done": "Done",
+}
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = "queued"  # queued | running | done | failed
+        self.stage = "queued"
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "stage_label": STAGE_LABELS.get(self.stage, self.stage),
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """In-process background job queue.
+
+    Jobs run on a thread pool, report progress per stage (and per skill while scoring)
+    and keep their result until evicted, so they survive Streamlit reruns. When a submit
+    takes the queue past max_jobs, the jobs that finished (or failed) longest ago are
+    evicted; queued and running jobs are always kept.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=500):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, progress=callback, **kwargs) in the background and return the job id"""
+        job = Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _evict(self):
+        """Drop the longest-finished jobs beyond max_jobs; call with the lock held"""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = sorted((job for job in self._jobs.values() if job.status in ("done", "failed")),
+                          key=lambda job: job.finished)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
+
+    def _run(self, job, fn, args, kwargs):
+        def progress(stage, done=0, total=0):
+            with self._lock:
+                job.stage = stage
+                job.done = done
+                job.total = total
+
+        with self._lock:
+            job.status = "running"
+        try:
+            result = fn(*args, progress=progress, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job.status = "failed"
+                job.error = str(e)
+                job.finished = time.time()
+            return
+        with self._lock:
+            job.result = result
+            job.status = "done"
+            job.stage = "done"
+            job.finished = time.time()
+
+    def status(self, job_id):
+        """Progress snapshot for a job, or None if the id is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def result(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.result if job else None
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,118 @@
+import bisect
+import re
+from collections import Counter, defaultdict
+
+# Keeps tech spellings such as c++, c#, node.js and ci/cd together as one token
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        token = token.rstrip("./-")
+        # Light plural folding, applied identically to skills and resume text
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def _stem(word):
+    """Crude prefix stem: "statistics"/"statistical" -> "statist", "modeling"/"model" -> "model" """
+    return word[:max(4, len(word) - 3)] if len(word) > 4 else word
+
+
+class LexicalIndex:
+    """Token/n-gram inverted index over the lines of a resume with BM25 scoring.
+
+    Each non-empty line (usually one bullet or heading) is a document, so a skill
+    repeated across many bullets accumulates evidence.
+    """
+
+    def __init__(self, text, max_ngram=3, k1=1.2, b=0.75):
+        self.max_ngram = max_ngram
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.doc_lengths = []
+        # Every word of the text, with hyphenated and slashed tokens also split into parts
+        words = set()
+        for line in text.splitlines():
+            tokens = tokenize(line)
+            if not tokens:
+                continue
+            words.update(part for token in tokens for part in re.split(r"[-/.]", token) + [token] if part)
+            doc_id = len(self.doc_lengths)
+            self.doc_lengths.append(len(tokens))
+            grams = Counter(
+                " ".join(tokens[i:i + n])
+                for n in range(1, max_ngram + 1)
+                for i in range(len(tokens) - n + 1)
+            )
+            for gram, tf in grams.items():
+                self.postings[gram][doc_id] = tf
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0
+        self._words = sorted(words)
+
+    def _term(self, phrase):
+        tokens = tokenize(phrase)
+        if not tokens or len(tokens) > self.max_ngram:
+            return None
+        return " ".join(tokens)
+
+    def bm25(self, phrase):
+        """Return (BM25 term-frequency evidence summed over matching lines, total mention count).
+
+        The lines of a single resume are not an independent corpus, so no IDF is applied:
+        it would penalize exactly the skills a candidate mentions everywhere.
+        """
+        term = self._term(phrase)
+        postings = self.postings.get(term) if term else None
+        if not postings:
+            return 0.0, 0
+        score = 0.0
+        for doc_id, tf in postings.items():
+            norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length
+            score += tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return score, sum(postings.values())
+
+    def _has_prefix(self, prefix):
+        i = bisect.bisect_left(self._words, prefix)
+        if i == len(self._words):
+            return False
+        # Short words ("r", "sh", "js") only count as whole words
+        return self._words[i] == prefix if len(prefix) <= 3 else self._words[i].startswith(prefix)
+
+    def may_mention(self, phrase):
+        """True if every word of phrase appears in the text in some form (shared stem, also
+        inside hyphenated words), so "Data Modeling" is matched by "data model" and
+        "Machine Learning" by "machine-learning"."""
+        words = [part for token in tokenize(phrase) for part in re.split(r"[-/.]", token) if part]
+        return bool(words) and all(self._has_prefix(_stem(word)) for word in words)
+
+    def evidence(self, phrases):
+        """BM25 evidence and total mentions summed across a skill and its aliases"""
+        total, mentions = 0.0, 0
+        for phrase in dict.fromkeys(phrases):
+            score, count = self.bm25(phrase)
+            total += score
+            mentions += count
+        return total, mentions
+
+    def prescore(self, skills, hit_aliases, miss_aliases, hit_bm25, skip_zero_evidence=True):
+        """Score skills with overwhelming or no lexical evidence.
+
+        Hits only count unambiguous spellings (hit_aliases); a skill is a miss only when
+        none of the broader miss_aliases appears, not even as a stem or inside a
+        hyphenated word.
+        Returns {skill: (score, reason)} for the confident skills only.
+        """
+        results = {}
+        for skill in skills:
+            evidence, mentions = self.evidence(hit_aliases(skill))
+            if evidence >= hit_bm25:
+                results[skill] = (min(9, 5 + mentions), f"Mentioned {mentions} times across the resume.")
+            elif skip_zero_evidence and not any(self.may_mention(alias) for alias in miss_aliases(skill)):
+                results[skill] = (0, "Not mentioned in the resume.")
+        return results
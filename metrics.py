@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _quantile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """In-memory counters and timing summaries with JSON and Prometheus text export"""
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self._counters = defaultdict(float)
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = {
+                    "count": 0, "sum": 0.0, "max": 0.0, "samples": deque(maxlen=self.max_samples),
+                }
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+            summary["samples"].append(value)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def summary(self, name, **labels):
+        """count / sum / max / p50 / p95 of an observed value (over the most recent samples)"""
+        with self._lock:
+            summary = self._summaries.get((name, _label_key(labels)))
+            if summary is None:
+                return {"count": 0, "sum": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0}
+            samples = list(summary["samples"])
+            return {
+                "count": summary["count"],
+                "sum": summary["sum"],
+                "max": summary["max"],
+                "p50": _quantile(samples, 0.50),
+                "p95": _quantile(samples, 0.95),
+            }
+
+    def cached_token_ratio(self, model=""):
+        """Share of prompt tokens served from the provider's prompt cache"""
+        prompt = self.counter("llm_prompt_tokens_total", model=model)
+        return self.counter("llm_cached_prompt_tokens_total", model=model) / prompt if prompt else 0.0
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def to_dict(self):
+        with self._lock:
+            keys = list(self._summaries)
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        summaries = [
+            {"name": name, "labels": dict(labels), **self.summary(name, **dict(labels))}
+            for name, labels in keys
+        ]
+        return {"counters": counters, "summaries": summaries}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            keys = sorted(self._summaries)
+        for (name, labels), value in counters:
+            lines.append(f"{name}{fmt(labels)} {value:g}")
+        for name, labels in keys:
+            summary = self.summary(name, **dict(labels))
+            lines.append(f'{name}{fmt(labels, [("quantile", "0.5")])} {summary["p50"]:g}')
+            lines.append(f'{name}{fmt(labels, [("quantile", "0.95")])} {summary["p95"]:g}')
+            lines.append(f"{name}_sum{fmt(labels)} {summary['sum']:g}")
+            lines.append(f"{name}_count{fmt(labels)} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every agent unless one is passed explicitly
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def trace(stage, timings=None, registry=REGISTRY):
+    """Time a pipeline stage into the registry and, optionally, a per-analysis timings dict"""
+    # Peak memory is only recorded while tracemalloc is tracing (e.g. in benchmark.py);
+    # the peak is process-wide, so overlapping stages share it
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("stage_seconds", elapsed, stage=stage)
+        if tracing:
+            registry.observe("stage_peak_bytes", tracemalloc.get_traced_memory()[1], stage=stage)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records wall time, token usage and errors of every LLM call"""
+
+    def __init__(self, registry=REGISTRY):
+        self.registry = registry
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), params.get("model_name") or params.get("model") or "")
+
+    def _finish(self, run_id):
+        """(elapsed seconds or None, model named in the call's parameters)"""
+        with self._lock:
+            start, model = self._starts.pop(run_id, (None, ""))
+        return (time.perf_counter() - start if start is not None else None), model
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        elapsed, model = self._finish(run_id)
+        generations = [g for batch in response.generations for g in batch]
+        if any((g.generation_info or {}).get("cached") for g in generations):
+            # Served by the LLM response cache (counted there), not a provider call
+            return
+        llm_output = response.llm_output or {}
+        message = getattr(generations[0], "message", None) if generations else None
+        metadata = getattr(message, "response_metadata", None) or {}
+        model = llm_output.get("model_name") or metadata.get("model_name") or model
+        if elapsed is not None:
+            self.registry.observe("llm_call_seconds", elapsed, model=model)
+        self.registry.inc("llm_calls_total", model=model)
+        usage = llm_output.get("token_usage") or {}
+        if usage:
+            self.registry.inc("llm_prompt_tokens_total", usage.get("prompt_tokens", 0), model=model)
+            self.registry.inc("llm_completion_tokens_total", usage.get("completion_tokens", 0), model=model)
+            # Prompt tokens the provider served from its prompt cache
+            cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+            self.registry.inc("llm_cached_prompt_tokens_total", cached, model=model)
+        elif getattr(message, "usage_metadata", None):
+            # Streamed calls report usage on the message only (with stream_usage enabled)
+            self.registry.inc("llm_prompt_tokens_total", message.usage_metadata.get("input_tokens", 0), model=model)
+            self.registry.inc("llm_completion_tokens_total", message.usage_metadata.get("output_tokens", 0),
+                              model=model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+        self.registry.inc("llm_errors_total", error=type(error).__name__)
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that records wall time and text count of every call to the model"""
+
+    def __init__(self, embeddings, model_name, registry=REGISTRY):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.registry = registry
+
+    def _record(self, start, texts):
+        self.registry.observe("embedding_call_seconds", time.perf_counter() - start, model=self.model_name)
+        self.registry.inc("embedding_texts_total", texts, model=self.model_name)
+
+    def embed_documents(self, texts):
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        self._record(start, len(texts))
+        return vectors
+
+    def embed_query(self, text):
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self._record(start, 1)
+        return vector
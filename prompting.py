@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _get_encoding(model):
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # tiktoken missing or its BPE files unavailable offline
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Count tokens locally with tiktoken, falling back to ~4 characters per token"""
+    encoding = _get_encoding((model or "gpt-4o").split("/")[-1].split(":")[0])
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def index_chunks(vectorstore):
+    """All chunks of a FAISS store, in document order"""
+    ids = vectorstore.index_to_docstore_id
+    return [vectorstore.docstore.search(ids[i]) for i in range(len(ids))]
+
+
+def build_context(text, budget, vectorstore=None, queries=(), model="gpt-4o"):
+    """Resume content for a prompt, within budget tokens.
+
+    The whole text is used when it fits. Otherwise chunks are ranked by similarity to
+    the queries (round-robin across queries, so every query gets its best chunks first),
+    added until the budget is spent and returned in their original order.
+    """
+    if not text or count_tokens(text, model) <= budget:
+        return text or ""
+    chunks = index_chunks(vectorstore) if vectorstore is not None else []
+    if not chunks:
+        return _truncate(text, budget, model)
+
+    order = list(range(len(chunks)))
+    queries = [q for q in queries if q]
+    if queries:
+        # One embedding call for all queries, then one FAISS search ranking every chunk
+        query_vectors = np.asarray(vectorstore.embeddings.embed_documents(queries), dtype=np.float32)
+        _, ranked = vectorstore.index.search(query_vectors, len(chunks))
+        order = []
+        for column in ranked.T:
+            for i in column:
+                if i >= 0 and i not in order:
+                    order.append(int(i))
+        order += [i for i in range(len(chunks)) if i not in order]
+
+    selected, used = [], 0
+    for i in order:
+        cost = count_tokens(chunks[i].page_content, model)
+        if used + cost > budget:
+            continue
+        selected.append(i)
+        used += cost
+    if not selected:
+        return _truncate(chunks[order[0]].page_content, budget, model)
+    return "\n...\n".join(chunks[i].page_content for i in sorted(selected))
+
+
+def _truncate(text, budget, model):
+    encoding = _get_encoding((model or "gpt-4o").split("/")[-1].split(":")[0])
+    if encoding is None:
+        return text[:budget * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+
+from cache import open_sqlite, content_hash
+
+
+def requirements_key(role_requirements=None, jd_hash=None):
+    """Stable hash of what a resume was scored against: a JD file's content hash or a skill list"""
+    if jd_hash:
+        return content_hash("jd", jd_hash)
+    return content_hash("skills", *sorted(role_requirements or []))
+
+
+class ResultStore:
+    """Finished analyses keyed by (resume hash, requirements hash, model), stored as JSON in SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                resume_hash TEXT NOT NULL,
+                requirements_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                name TEXT,
+                overall_score INTEGER NOT NULL,
+                resume_text TEXT NOT NULL,
+                skills TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (resume_hash, requirements_hash, model)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_score ON results (overall_score)")
+        self._conn.commit()
+
+    def get(self, resume_hash, requirements_hash, model):
+        """Return {"resume_text", "skills", "result", ...} or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, resume_text, skills, result, created FROM results "
+                "WHERE resume_hash = ? AND requirements_hash = ? AND model = ?",
+                (resume_hash, requirements_hash, model),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "name": row[0],
+            "resume_text": row[1],
+            "skills": json.loads(row[2]),
+            "result": json.loads(row[3]),
+            "created": row[4],
+        }
+
+    def put(self, resume_hash, requirements_hash, model, resume_text, skills, result, name=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (resume_hash, requirements_hash, model, name, overall_score, "
+                "resume_text, skills, result, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (resume_hash, requirements_hash, model, name, int(result.get("overall_score", 0)),
+                 resume_text, json.dumps(list(skills)), json.dumps(result), time.time()),
+            )
+            self._conn.commit()
+
+    def list(self, min_score=None, max_score=None, model=None, requirements_hash=None, limit=100):
+        """Summaries of stored analyses, best score first"""
+        clauses, params = [], []
+        for column, op, value in (("overall_score", ">=", min_score), ("overall_score", "<=", max_score),
+                                  ("model", "=", model), ("requirements_hash", "=", requirements_hash)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT resume_hash, requirements_hash, model, name, overall_score, skills, created FROM results "
+                f"{where} ORDER BY overall_score DESC, created DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [
+            {
+                "resume_hash": row[0],
+                "requirements_hash": row[1],
+                "model": row[2],
+                "name": row[3],
+                "overall_score": row[4],
+                "skills": json.loads(row[5]),
+                "created": row[6],
+            }
+            for row in rows
+        ]
+
+    def delete(self, resume_hash, requirements_hash=None, model=None):
+        clauses, params = ["resume_hash = ?"], [resume_hash]
+        if requirements_hash is not None:
+            clauses.append("requirements_hash = ?")
+            params.append(requirements_hash)
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM results WHERE {' AND '.join(clauses)}", params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,275 @@
+"""Headless batch screening of a directory (or glob) of resumes.
+
+Examples:
+    python screen.py resumes/ --role "Data Engineer" --output results.jsonl
+    python screen.py "resumes/*.pdf" --jd job.txt --output results.csv --workers 8 --leaderboard top.csv
+
+The job description is parsed, and its skills embedded, once before any resume is
+scored; workers share that work through the persistent caches. Results are appended as
+each resume finishes. Completed resumes are recorded, per requirements and model, in a
+checkpoint file (default: <output>.checkpoint) and skipped when the command is re-run
+with the same --role/--jd and --model. At the end every result in the output file for
+those requirements is ranked by score into a leaderboard.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from config import MODEL_NAME, BASE_URL, ROLE_REQUIREMENTS
+from results import requirements_key
+
+RESUME_EXTENSIONS = (".pdf", ".txt")
+CSV_FIELDS = ["file", "resume_hash", "requirements_hash", "model", "overall_score", "selected", "strengths",
+              "missing_skills", "reasoning"]
+
+_agent = None
+
+
+def _init_worker(api_key, model_name, base_url, cutoff_score):
+    global _agent
+    from agents import ResumeAnalysisAgent
+
+    _agent = ResumeAnalysisAgent(
+        api_key=api_key,
+        model_name=model_name,
+        base_url=base_url,
+        cutoff_score=cutoff_score,
+    )
+
+
+def _screen_one(path, resume_hash, skills):
+    from agents import ANALYSIS_FAILED, analysis_failed
+
+    with open(path, "rb") as resume_file:
+        result = _agent.analyze_resume(resume_file, role_requirements=skills)
+    if analysis_failed(result):
+        # Not written or checkpointed, so a re-run scores the resume again
+        failed = [skill for skill, reason in result["skill_reasoning"].items() if reason == ANALYSIS_FAILED]
+        raise RuntimeError(f"scoring failed for {', '.join(failed)}")
+
+    return {
+        "file": path,
+        "resume_hash": resume_hash,
+        "overall_score": result.get("overall_score", 0),
+        "selected": result.get("selected", False),
+        "strengths": result.get("strengths", []),
+        "missing_skills": result.get("missing_skills", []),
+        "skill_scores": result.get("skill_scores", {}),
+        "reasoning": result.get("reasoning", ""),
+    }
+
+
+def find_resumes(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        paths.extend(p for p in matches if os.path.isfile(p) and p.lower().endswith(RESUME_EXTENSIONS))
+    return sorted(dict.fromkeys(paths))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checkpoint_key(resume_hash, requirements_hash, model):
+    """A resume is done only for the requirements and model it was screened with"""
+    return f"{resume_hash}\t{requirements_hash}\t{model}"
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+class ResultWriter:
+    """Appends one row per finished resume to a JSONL or CSV file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_csv = path.lower().endswith(".csv")
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        if self.is_csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, row):
+        if self.is_csv:
+            self._writer.writerow({
+                **row,
+                "strengths": "; ".join(row["strengths"]),
+                "missing_skills": "; ".join(row["missing_skills"]),
+            })
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def load_results(path):
+    """Every row written to a JSONL or CSV output file"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8", newline="") as f:
+        if not path.lower().endswith(".csv"):
+            return [json.loads(line) for line in f if line.strip()]
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["overall_score"] = int(row["overall_score"] or 0)
+        row["selected"] = row["selected"] == "True"
+        row["strengths"] = [s for s in row["strengths"].split("; ") if s]
+        row["missing_skills"] = [s for s in row["missing_skills"].split("; ") if s]
+    return rows
+
+
+def leaderboard(rows, requirements_hash, model):
+    """Rows for one set of requirements and model ranked by overall_score (latest result
+    per resume), with a 1-based rank"""
+    latest = {
+        row["resume_hash"]: row for row in rows
+        if row.get("requirements_hash") == requirements_hash and row.get("model") == model
+    }
+    ranked = sorted(latest.values(), key=lambda row: row["overall_score"], reverse=True)
+    return [{"rank": i, **row} for i, row in enumerate(ranked, 1)]
+
+
+def write_leaderboard(ranked, path):
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["rank"] + CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for row in ranked:
+                writer.writerow({
+                    **row,
+                    "strengths": "; ".join(row["strengths"]),
+                    "missing_skills": "; ".join(row["missing_skills"]),
+                })
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for row in ranked:
+                f.write(json.dumps(row) + "\n")
+
+
+def print_leaderboard(ranked, top):
+    print(f"\n{'#':>4}  {'score':>5}  {'resume':<40} missing skills")
+    for row in ranked[:top]:
+        name = os.path.basename(row["file"])
+        print(f"{row['rank']:>4}  {row['overall_score']:>5}  {name:<40} {', '.join(row['missing_skills']) or '-'}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a batch of resumes against a role or job description.")
+    parser.add_argument("resumes", nargs="+", help="Resume files, directories or glob patterns (.pdf / .txt)")
+    requirements = parser.add_mutually_exclusive_group(required=True)
+    requirements.add_argument("--role", choices=sorted(ROLE_REQUIREMENTS), help="Predefined role")
+    requirements.add_argument("--jd", help="Job description file (.pdf / .txt)")
+    parser.add_argument("--output", "-o", default="screening_results.jsonl", help="Output .jsonl or .csv file")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--cutoff", type=int, default=75, help="Score needed to be selected")
+    parser.add_argument("--leaderboard", help="Also write the ranked results to this .jsonl or .csv file")
+    parser.add_argument("--top", type=int, default=20, help="Leaderboard rows to print")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--base-url", default=BASE_URL)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    load_dotenv()
+    args = parse_args(argv)
+
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        print("OPENROUTER_API_KEY is not set.", file=sys.stderr)
+        return 1
+
+    paths = find_resumes(args.resumes)
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+    if args.jd:
+        requirements_hash = requirements_key(jd_hash=file_hash(args.jd))
+    else:
+        requirements_hash = requirements_key(ROLE_REQUIREMENTS[args.role])
+    done = load_checkpoint(checkpoint_path)
+    pending = [(path, file_hash(path)) for path in paths]
+    pending = [(path, h) for path, h in pending if checkpoint_key(h, requirements_hash, args.model) not in done]
+    print(f"{len(paths)} resumes found, {len(paths) - len(pending)} already screened, {len(pending)} to go")
+
+    failures = 0
+    if pending:
+        failures = screen(pending, args, api_key, checkpoint_path, requirements_hash)
+
+    ranked = leaderboard(load_results(args.output), requirements_hash, args.model)
+    print_leaderboard(ranked, args.top)
+    if args.leaderboard:
+        write_leaderboard(ranked, args.leaderboard)
+    return 1 if failures else 0
+
+
+def screen(pending, args, api_key, checkpoint_path, requirements_hash):
+    """Score pending (path, hash) pairs in worker processes; returns the number of failures"""
+    from agents import ResumeAnalysisAgent
+
+    # Shared requirements work happens once, in the parent
+    agent = ResumeAnalysisAgent(api_key=api_key, model_name=args.model, base_url=args.base_url)
+    try:
+        if args.jd:
+            with open(args.jd, "rb") as jd_file:
+                skills = agent.prepare_requirements(custom_jd=jd_file)
+            print(f"{len(skills)} skills from {args.jd}: {', '.join(skills)}")
+        else:
+            skills = agent.prepare_requirements(role_requirements=ROLE_REQUIREMENTS[args.role])
+    finally:
+        agent.close()
+    if not skills:
+        print("No skills found in the job description.", file=sys.stderr)
+        return len(pending)
+
+    writer = ResultWriter(args.output)
+    failures = 0
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, ProcessPoolExecutor(
+        max_workers=max(1, args.workers),
+        initializer=_init_worker,
+        initargs=(api_key, args.model, args.base_url, args.cutoff),
+    ) as executor:
+        futures = {
+            executor.submit(_screen_one, path, h, skills): path
+            for path, h in pending
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[{i}/{len(pending)}] {path}: failed ({e})", file=sys.stderr)
+                continue
+            row.update(requirements_hash=requirements_hash, model=args.model)
+            writer.write(row)
+            checkpoint.write(checkpoint_key(row["resume_hash"], requirements_hash, args.model) + "\n")
+            checkpoint.flush()
+            print(f"[{i}/{len(pending)}] {path}: {row['overall_score']}/100")
+    writer.close()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import threading
+
+from agents import ResumeAnalysisAgent, AnalysisContext
+from jobs import JobQueue
+
+
+class AnalysisService:
+    """Thread-safe analysis service shared by every session in the process.
+
+    Clients, caches and the skill taxonomy live on one agent; all per-resume state is
+    kept in the AnalysisContext passed to each call, so concurrent sessions only cost
+    their own context.
+    """
+
+    def __init__(self, api_key, model_name="gpt-4o", base_url=None, job_workers=4, **agent_options):
+        self.jobs = JobQueue(max_workers=job_workers)
+        self.agent = ResumeAnalysisAgent(api_key=api_key, model_name=model_name, base_url=base_url, **agent_options)
+        self.agent.get_embeddings()
+        self.agent.get_taxonomy()
+
+    def new_context(self):
+        return AnalysisContext()
+
+    def analyze_resume(self, context, resume_file, role_requirements=None, custom_jd=None, progress=None):
+        return self.agent.bind(context).analyze_resume(resume_file, role_requirements=role_requirements,
+                                                       custom_jd=custom_jd, progress=progress)
+
+    def submit_analysis(self, context, resume_file, role_requirements=None, custom_jd=None):
+        """Start analyze_resume in the background; returns a job id for jobs.status / jobs.result"""
+        return self.jobs.submit(self.analyze_resume, context, resume_file,
+                                role_requirements=role_requirements, custom_jd=custom_jd)
+
+    def ask_question(self, context, question):
+        return self.agent.bind(context).ask_question(question)
+
+    def ask_questions(self, context, questions):
+        return self.agent.bind(context).ask_questions(questions)
+
+    def stream_answer(self, context, question):
+        return self.agent.bind(context).stream_answer(question)
+
+    def generate_interview_questions(self, context, question_types, difficulty, num_questions):
+        return self.agent.bind(context).generate_interview_questions(question_types, difficulty, num_questions)
+
+    def improve_resume(self, context, improvement_areas, target_role=""):
+        return self.agent.bind(context).improve_resume(improvement_areas, target_role)
+
+    def get_improved_resume(self, context, target_role="", highlight_skills=""):
+        return self.agent.bind(context).get_improved_resume(target_role, highlight_skills)
+
+    def stream_improved_resume(self, context, target_role="", highlight_skills=""):
+        return self.agent.bind(context).stream_improved_resume(target_role, highlight_skills)
+
+    def list_results(self, min_score=None, max_score=None, limit=100):
+        return self.agent.list_results(min_score, max_score, limit)
+
+    def find_candidates(self, skills, top_n=50, min_similarity=0.0):
+        return self.agent.find_candidates(skills, top_n, min_similarity)
+
+    def close(self):
+        self.jobs.shutdown()
+        self.agent.close()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(api_key, model_name="gpt-4o", base_url=None, **agent_options):
+    """Process-wide AnalysisService for one (api_key, model, base_url) configuration"""
+    key = (api_key, model_name, base_url, tuple(sorted(agent_options.items())))
+    with _services_lock:
+        if key not in _services:
+            _services[key] = AnalysisService(api_key, model_name=model_name, base_url=base_url, **agent_options)
+        return _services[key]
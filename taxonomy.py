@@ -0,0 +1,258 @@
+"""Versioned on-disk embedding index of the predefined role skills and their synonyms.
+
+Build (or rebuild) it ahead of time with:
+    python taxonomy.py
+"""
+import json
+import os
+
+import numpy as np
+
+from config import ROLE_REQUIREMENTS
+
+TAXONOMY_VERSION = 2
+
+# Resume bullets that calibration chunks are made of, one skill each, so a chunk reads
+# like a role section that mentions a few skills
+CALIBRATION_BULLETS = [
+    "- Built and maintained production services using {skill}.",
+    "- Delivered a customer analytics project with {skill}, cutting costs by 20%.",
+    "- Mentored engineers and reviewed code that relied on {skill}.",
+]
+
+# Canonical skill -> alternative spellings found in resumes
+SKILL_SYNONYMS = {
+    "PostgreSQL": ["Postgres", "psql"],
+    "Kubernetes": ["K8s", "EKS", "GKE", "AKS"],
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "Node.js": ["Node", "NodeJS"],
+    "Next.js": ["NextJS", "Next"],
+    "Vue.js": ["Vue", "VueJS"],
+    "React": ["React.js", "ReactJS"],
+    "Express": ["Express.js", "ExpressJS"],
+    "MongoDB": ["Mongo"],
+    "Machine Learning": ["ML"],
+    "Deep Learning": ["DL", "Neural Networks"],
+    "NLP": ["Natural Language Processing"],
+    "Computer Vision": ["CV", "Image Recognition"],
+    "Reinforcement Learning": ["RL"],
+    "Scikit-Learn": ["sklearn", "scikit learn"],
+    "Hugging Face": ["HuggingFace", "Transformers"],
+    "TensorFlow": ["TF", "Keras"],
+    "PyTorch": ["Torch"],
+    "AWS": ["Amazon Web Services", "EC2", "S3", "Lambda"],
+    "GCP": ["Google Cloud", "Google Cloud Platform"],
+    "Azure": ["Microsoft Azure"],
+    "CI/CD": ["Continuous Integration", "Continuous Delivery", "GitHub Actions", "GitLab CI"],
+    "Apache Spark": ["Spark", "PySpark"],
+    "Kafka": ["Apache Kafka"],
+    "Airflow": ["Apache Airflow"],
+    "Hadoop": ["HDFS", "MapReduce"],
+    "ETL": ["ELT", "Extract Transform Load"],
+    "REST API": ["REST", "RESTful", "RESTful APIs"],
+    "REST APIs": ["REST", "RESTful", "RESTful APIs"],
+    "Tailwind CSS": ["Tailwind", "TailwindCSS"],
+    "Spring Boot": ["Spring"],
+    "Shell Scripting": ["Bash", "Shell", "sh"],
+    "Power BI": ["PowerBI"],
+    "Excel": ["Microsoft Excel", "Spreadsheets"],
+    "BigQuery": ["Big Query"],
+    "dbt": ["data build tool"],
+    "MLOps": ["ML Ops", "MLflow", "Kubeflow"],
+    "Data Visualization": ["Dataviz", "Visualisation"],
+    "UI/UX Design": ["UI Design", "UX Design", "Figma"],
+    "Authentication": ["OAuth", "JWT", "SSO"],
+    "Monitoring": ["Observability"],
+    "Testing": ["Unit Testing", "Jest", "pytest", "Cypress"],
+}
+
+
+# Exact spelling variants, safe for text matching. SKILL_SYNONYMS also holds related tools
+# and short forms ("Next", "TF", "Keras") that only make sense for embedding lookups.
+LEXICAL_SYNONYMS = {
+    "PostgreSQL": ["Postgres"],
+    "Kubernetes": ["K8s"],
+    "JavaScript": ["ECMAScript"],
+    "Node.js": ["NodeJS"],
+    "Next.js": ["NextJS"],
+    "Vue.js": ["VueJS"],
+    "React": ["React.js", "ReactJS"],
+    "Express": ["Express.js", "ExpressJS"],
+    "NLP": ["Natural Language Processing"],
+    "Scikit-Learn": ["sklearn", "scikit learn"],
+    "Hugging Face": ["HuggingFace"],
+    "AWS": ["Amazon Web Services"],
+    "GCP": ["Google Cloud", "Google Cloud Platform"],
+    "Azure": ["Microsoft Azure"],
+    "Apache Spark": ["PySpark"],
+    "Kafka": ["Apache Kafka"],
+    "Airflow": ["Apache Airflow"],
+    "REST API": ["RESTful"],
+    "REST APIs": ["RESTful"],
+    "Tailwind CSS": ["TailwindCSS"],
+    "Power BI": ["PowerBI"],
+    "BigQuery": ["Big Query"],
+    "Shell Scripting": ["Bash scripting", "Shell script"],
+}
+
+# Skill names that are also everyday words or single letters; their plain mentions
+# never count as lexical hits
+AMBIGUOUS_NAMES = {"express", "react", "excel", "r", "next", "node", "spring", "shell"}
+
+
+def all_role_skills():
+    skills = []
+    for role_skills in ROLE_REQUIREMENTS.values():
+        skills.extend(role_skills)
+    return list(dict.fromkeys(skills))
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class SkillTaxonomy:
+    """Skill name and synonym embeddings used to score obvious hits and misses without an LLM call"""
+
+    def __init__(self, model, terms, vectors, thresholds, normalized=False):
+        self.model = model
+        # terms: list of (canonical skill, surface form); vectors: row-aligned, L2-normalized.
+        # Saved vectors are already normalized, so a memory-mapped matrix is used as is.
+        self.terms = terms
+        if not len(terms):
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        elif not normalized:
+            vectors = _normalize(vectors)
+        self.vectors = vectors
+        # {"hit": ..., "miss": ...} best-chunk similarities, calibrated for this embedding model
+        self.thresholds = thresholds
+        self._rows = {}
+        for i, (skill, _) in enumerate(terms):
+            self._rows.setdefault(skill.lower(), []).append(i)
+
+    @staticmethod
+    def aliases(skill):
+        synonyms = {k.lower(): v for k, v in SKILL_SYNONYMS.items()}
+        return [skill] + synonyms.get(skill.lower(), [])
+
+    @staticmethod
+    def lexical_aliases(skill):
+        """Unambiguous spellings of skill for exact text matching"""
+        names = [] if skill.lower() in AMBIGUOUS_NAMES else [skill]
+        synonyms = {k.lower(): v for k, v in LEXICAL_SYNONYMS.items()}
+        return names + synonyms.get(skill.lower(), [])
+
+    @classmethod
+    def build(cls, embeddings, model, skills=None):
+        skills = skills or all_role_skills()
+        terms = [(skill, alias) for skill in skills for alias in cls.aliases(skill)]
+        vectors = embeddings.embed_documents([alias for _, alias in terms])
+        return cls(model, terms, vectors, cls.calibrate(skills, embeddings))
+
+    @staticmethod
+    def calibrate(skills, embeddings):
+        """Hit/miss thresholds from how this model scores resume-like chunks against skill names.
+
+        Each calibration chunk mentions three skills. A hit must be as similar as a typical
+        chunk mentioning the skill (median); a miss must be below nearly all chunks that do
+        not mention it (95th percentile), since a resume's best chunk is the maximum over
+        several of them, and below nearly all chunks that do.
+        """
+        skills = list(dict.fromkeys(skills))
+        if len(skills) <= len(CALIBRATION_BULLETS):
+            return {"hit": 1.01, "miss": -1.0}
+        groups = [[skills[(i + j) % len(skills)] for j in range(len(CALIBRATION_BULLETS))]
+                  for i in range(len(skills))]
+        chunks = ["\n".join(bullet.format(skill=skill) for bullet, skill in zip(CALIBRATION_BULLETS, group))
+                  for group in groups]
+        similarities = (_normalize(embeddings.embed_documents(skills))
+                        @ _normalize(embeddings.embed_documents(chunks)).T)
+        mentioned = np.array([[skill in group for group in groups] for skill in skills])
+        positives, negatives = similarities[mentioned], similarities[~mentioned]
+        hit = float(np.median(positives))
+        miss = min(float(np.percentile(negatives, 95)), float(np.percentile(positives, 5)))
+        if hit <= miss:
+            # The model does not separate skills; only the LLM decides
+            return {"hit": 1.01, "miss": -1.0}
+        return {"hit": hit, "miss": miss}
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "skill_vectors.npy"), self.vectors)
+        with open(os.path.join(directory, "skill_terms.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": TAXONOMY_VERSION, "model": self.model, "thresholds": self.thresholds,
+                       "terms": self.terms}, f)
+
+    @classmethod
+    def load(cls, directory, model):
+        """Load a saved index, or return None if it is missing or was built for another version/model"""
+        try:
+            with open(os.path.join(directory, "skill_terms.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != TAXONOMY_VERSION or meta.get("model") != model:
+                return None
+            vectors = np.load(os.path.join(directory, "skill_vectors.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        return cls(model, [tuple(term) for term in meta["terms"]], vectors, meta["thresholds"], normalized=True)
+
+    @classmethod
+    def load_or_build(cls, directory, embeddings, model):
+        taxonomy = cls.load(directory, model)
+        if taxonomy is None:
+            taxonomy = cls.build(embeddings, model)
+            taxonomy.save(directory)
+        return taxonomy
+
+    def skill_vectors(self, skills, embeddings):
+        """Normalized embedding rows for each skill and its aliases; unknown skills are embedded on the fly"""
+        unknown = [skill for skill in skills if skill.lower() not in self._rows]
+        extra = {}
+        if unknown:
+            terms = [(skill, alias) for skill in unknown for alias in self.aliases(skill)]
+            vectors = _normalize(embeddings.embed_documents([alias for _, alias in terms]))
+            for (skill, _), vector in zip(terms, vectors):
+                extra.setdefault(skill, []).append(vector)
+        return {
+            skill: np.stack(extra[skill]) if skill in extra else self.vectors[self._rows[skill.lower()]]
+            for skill in skills
+        }
+
+    def prescore(self, skills, vectorstore, embeddings, hit_similarity=None, miss_similarity=None,
+                 hit_score=8, mentioned=()):
+        """Score skills whose best chunk similarity is clearly high or clearly low.
+
+        Thresholds default to the calibrated ones; skills in mentioned (found in the text)
+        are never scored as misses. Returns {skill: (score, reason)} for the confident
+        skills only; the rest are left for the LLM.
+        """
+        hit_similarity = self.thresholds["hit"] if hit_similarity is None else hit_similarity
+        miss_similarity = self.thresholds["miss"] if miss_similarity is None else miss_similarity
+        index = vectorstore.index
+        if not skills or index.ntotal == 0:
+            return {}
+        chunks = _normalize(index.reconstruct_n(0, index.ntotal))
+
+        results = {}
+        for skill, vectors in self.skill_vectors(skills, embeddings).items():
+            best = float((chunks @ np.asarray(vectors).T).max())
+            if best >= hit_similarity:
+                results[skill] = (hit_score, f"Strong semantic match in the resume (similarity {best:.2f}).")
+            elif best < miss_similarity and skill not in mentioned:
+                results[skill] = (0, "No related experience found in the resume.")
+        return results
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from agents import ResumeAnalysisAgent
+    from config import MODEL_NAME, BASE_URL
+
+    load_dotenv()
+    agent = ResumeAnalysisAgent(api_key=os.getenv("OPENROUTER_API_KEY", ""), model_name=MODEL_NAME, base_url=BASE_URL)
+    taxonomy = SkillTaxonomy.build(agent.get_embeddings(), agent.embedding_model)
+    taxonomy.save(agent.taxonomy_dir)
+    print(f"Saved {len(taxonomy.terms)} skill terms to {agent.taxonomy_dir}")
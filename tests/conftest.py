@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents  # noqa: E402
+from benchmark import BenchmarkAgent  # noqa: E402
+
+
+class FailingScoringAgent(BenchmarkAgent):
+    """Offline agent whose LLM skill scoring always raises, as during a provider outage"""
+
+    def _score_skill(self, vectorstore, skill):
+        raise RuntimeError("LLM unavailable")
+
+
+@pytest.fixture
+def offline_agent(tmp_path, monkeypatch):
+    """Install an offline agent class (fake LLM and embeddings, cache under tmp_path) as
+    agents.ResumeAnalysisAgent and return a function that switches it"""
+    cache_dir = str(tmp_path / "cache")
+
+    def install(base=BenchmarkAgent, **options):
+        class OfflineAgent(base):
+            def __init__(self, api_key=None, model_name=None, base_url=None, **kwargs):
+                super().__init__(cache_dir=cache_dir, taxonomy_dir=None, max_retries=0,
+                                 lexical_prescore=False, **{**kwargs, **options})
+
+        monkeypatch.setattr(agents, "ResumeAnalysisAgent", OfflineAgent)
+        return OfflineAgent
+
+    return install
@@ -0,0 +1,33 @@
+from chunking import split_resume, question_filter
+
+
+def sections(text):
+    return [(doc.metadata["section"], doc.page_content) for doc in split_resume(text)]
+
+
+def test_text_before_first_heading_is_header():
+    chunks = sections("JANE DOE\njane@example.com\nSUMMARY\nBackend engineer.")
+    assert chunks[0] == ("header", "JANE DOE\njane@example.com")
+    assert chunks[1][0] == "summary"
+
+
+def test_caps_skill_list_stays_in_skills_section():
+    chunks = sections("JANE DOE\nEXPERIENCE\n- Built APIs.\nSKILLS\nAWS\nSQL\nPython, Airflow\nEDUCATION\nB.Sc.")
+    assert [section for section, _ in chunks] == ["header", "experience", "skills", "education"]
+    assert chunks[2][1] == "SKILLS\nAWS\nSQL\nPython, Airflow"
+
+
+def test_unknown_caps_heading_starts_other_section():
+    chunks = sections("JANE DOE\nEXPERIENCE\n- Built APIs.\nVOLUNTEERING\n- Taught kids to code.")
+    assert chunks[-1] == ("other", "VOLUNTEERING\n- Taught kids to code.")
+
+
+def test_roles_split_experience_chunks():
+    chunks = split_resume("EXPERIENCE\nAcme, 2019 - 2021\n- Built APIs.\nGlobex, 2021 - present\n- Led a team.")
+    assert [doc.metadata["role"] for doc in chunks] == ["Acme, 2019 - 2021", "Globex, 2021 - present"]
+
+
+def test_question_filter_always_includes_skills_and_summary():
+    sections = question_filter("Does the candidate have experience with cloud platforms?")["section"]
+    assert {"experience", "projects", "skills", "summary"} <= set(sections)
+    assert question_filter("Tell me about them") is None
@@ -0,0 +1,37 @@
+from lexical import LexicalIndex
+from taxonomy import SkillTaxonomy
+
+RESUME = """Senior Data Engineer
+- Designed the data model and modeled star schemas for the warehouse
+- Applied machine-learning and statistical modeling to churn
+- Built ETL pipelines in Python on Postgres
+- Wrote Python services backed by Postgres replicas
+- Tuned Postgres queries for the Python reporting jobs
+- Maintained Python tooling and Postgres migrations
+- Python, Postgres
+- Shipped the next release of the billing app"""
+
+
+def prescore(skills):
+    return LexicalIndex(RESUME).prescore(skills, SkillTaxonomy.lexical_aliases, SkillTaxonomy.aliases, 4.0)
+
+
+def test_repeated_mentions_are_hits():
+    results = prescore(["Python", "PostgreSQL"])
+    assert results["Python"][0] >= 5
+    assert results["PostgreSQL"][0] >= 5
+
+
+def test_unmentioned_skills_are_misses():
+    results = prescore(["Kafka", "Tableau"])
+    assert results == {"Kafka": (0, "Not mentioned in the resume."), "Tableau": (0, "Not mentioned in the resume.")}
+
+
+def test_ambiguous_words_are_not_hits_or_misses():
+    # "next" is an everyday word: neither proof of Next.js nor grounds to skip the LLM
+    assert "Next.js" not in prescore(["Next.js"])
+
+
+def test_stems_and_hyphenated_words_count_as_mentions():
+    skills = ["Data Engineering", "Data Modeling", "Data Warehousing", "Machine Learning", "Statistics"]
+    assert prescore(skills) == {}
@@ -0,0 +1,33 @@
+import io
+
+from agents import AnalysisContext, ANALYSIS_FAILED
+from benchmark import BenchmarkAgent
+from conftest import FailingScoringAgent
+
+SKILLS = ["Python", "Kafka"]
+
+
+def resume():
+    data = io.BytesIO(b"SUMMARY\nData engineer.\nEXPERIENCE\n- Streamed events through Kafka with Python.")
+    data.name = "resume.txt"
+    return data
+
+
+def analyze(agent_class, cache_dir):
+    agent = agent_class(cache_dir=cache_dir, taxonomy_dir=None, max_retries=0, lexical_prescore=False)
+    try:
+        return agent.bind(AnalysisContext()).analyze_resume(resume(), role_requirements=SKILLS)
+    finally:
+        agent.close()
+
+
+def test_failed_analysis_is_not_stored(tmp_path):
+    failed = analyze(FailingScoringAgent, str(tmp_path))
+    assert set(failed["skill_reasoning"].values()) == {ANALYSIS_FAILED}
+
+    result = analyze(BenchmarkAgent, str(tmp_path))
+    assert "stored" not in result["timings"]
+    assert ANALYSIS_FAILED not in result["skill_reasoning"].values()
+
+    # A successful analysis is stored and served from the store
+    assert "stored" in analyze(BenchmarkAgent, str(tmp_path))["timings"]
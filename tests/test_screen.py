@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+import screen
+from conftest import FailingScoringAgent
+
+RESUMES = {
+    "alice.txt": "ALICE\nSUMMARY\nData analyst.\nSKILLS\nSQL, Python, Excel, Tableau\n"
+                 "EXPERIENCE\n- Built SQL dashboards in Tableau.\n- Automated Excel reports with Python.",
+    "bob.txt": "BOB\nSUMMARY\nLine cook.\nEXPERIENCE\n- Prepared meals for 200 guests a night.",
+}
+
+
+@pytest.fixture
+def resume_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "offline")
+    directory = tmp_path / "resumes"
+    directory.mkdir()
+    for name, text in RESUMES.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return directory
+
+
+def run(resume_dir, tmp_path, role="Data Analyst"):
+    output = tmp_path / "out.csv"
+    code = screen.main([str(resume_dir), "--role", role, "-o", str(output), "--workers", "1",
+                        "--leaderboard", str(tmp_path / "top.csv")])
+    checkpoint = output.with_name("out.csv.checkpoint")
+    lines = checkpoint.read_text(encoding="utf-8").splitlines() if checkpoint.exists() else []
+    with open(tmp_path / "top.csv", encoding="utf-8", newline="") as f:
+        leaderboard = list(csv.DictReader(f))
+    return code, lines, leaderboard
+
+
+def test_checkpoint_and_leaderboard_round_trip(resume_dir, tmp_path, offline_agent, capsys):
+    offline_agent()
+    code, lines, leaderboard = run(resume_dir, tmp_path)
+    assert code == 0
+    assert len(lines) == 2
+    assert [row["rank"] for row in leaderboard] == ["1", "2"]
+    assert leaderboard[0]["file"].endswith("alice.txt")
+
+    # A re-run with the same role and model skips every resume
+    capsys.readouterr()
+    code, lines, leaderboard = run(resume_dir, tmp_path)
+    assert code == 0 and len(lines) == 2 and len(leaderboard) == 2
+    assert "2 already screened, 0 to go" in capsys.readouterr().out
+
+    # Another role is screened again and ranked on its own
+    code, lines, leaderboard = run(resume_dir, tmp_path, role="DevOps Engineer")
+    assert len(lines) == 4 and len(leaderboard) == 2
+
+
+def test_failed_analyses_are_not_checkpointed(resume_dir, tmp_path, offline_agent):
+    offline_agent(FailingScoringAgent)
+    code, lines, leaderboard = run(resume_dir, tmp_path)
+    assert code == 1
+    assert lines == [] and leaderboard == []
+
+    # Once the LLM is back, the same command screens them
+    offline_agent()
+    code, lines, leaderboard = run(resume_dir, tmp_path)
+    assert code == 0 and len(lines) == 2 and len(leaderboard) == 2
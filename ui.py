@@ -3,6 +3,15 @@ import matplotlib.pyplot as plt
 import base64
 
 
+EXAMPLE_QUESTIONS = [
+    "What is the candidate's most recent role and key achievements?",
+    "How many years of experience do they have in Python?",
+    "Does the candidate have experience with cloud platforms?",
+    "What projects demonstrate leadership or teamwork?",
+    "Summarize the candidate's education background."
+]
+
+
 def display_header():
     logo_html = '<div style="font-size:50px; text-align:center;">🧑‍💼</div>'
     st.markdown(f"""
@@ -261,6 +270,12 @@ def display_analysis_result(analysis_result):
                     for i, sugg in enumerate(weakness['suggestions']):
                         st.markdown(f'<div class="solution-detail">{i+1}. {sugg}</div>', unsafe_allow_html=True)
 
+    timings = analysis_result.get("timings")
+    if timings:
+        with st.expander("⏱️ Timing Breakdown", expanded=False):
+            for stage, seconds in timings.items():
+                st.markdown(f"**{stage.replace('_', ' ').title()}:** {seconds:.2f}s")
+
     # Download Report
     st.markdown("---")
     report_content = f"""# Resume Analysis Report
@@ -284,6 +299,10 @@ def display_analysis_result(analysis_result):
         if w.get('suggestions'):
             report_content += "\nSuggestions:\n" + "\n".join([f"- {s}" for s in w['suggestions']]) + "\n"
 
+    if timings:
+        report_content += "\n## Timing Breakdown\n" + "\n".join(
+            [f"- {stage}: {seconds:.2f}s" for stage, seconds in timings.items()]) + "\n"
+
     b64 = base64.b64encode(report_content.encode()).decode()
     href = f'<a class="download-btn" href="data:text/plain;base64,{b64}" download="Resume_Analysis_Report.txt">📥 Download Full Report</a>'
     st.markdown(href, unsafe_allow_html=True)
@@ -291,7 +310,17 @@ def display_analysis_result(analysis_result):
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-def resume_qa_selection(has_resume, ask_question_func=None):
+def display_job_progress(status):
+    if status["stage"] == "scoring" and status["total"]:
+        fraction = status["done"] / status["total"]
+        text = f"🔍 {status['stage_label']}... {status['done']}/{status['total']} skills"
+    else:
+        fraction = 0.0
+        text = f"🔍 {status['stage_label']}..."
+    st.progress(fraction, text=text)
+
+
+def resume_qa_selection(has_resume, ask_question_func=None, stream_question_func=None, ask_questions_func=None):
     if not has_resume:
         st.warning("Please analyze a resume first in the 'Resume Analysis' tab.")
         return
@@ -304,24 +333,28 @@ def resume_qa_selection(has_resume, ask_question_func=None):
         placeholder="e.g., What is the candidate's strongest technical skill?"
     )
 
-    if question and ask_question_func:
+    if question and stream_question_func:
+        st.markdown(f"**Q:** {question}")
+        with st.container(border=True):
+            st.write_stream(stream_question_func(question))
+    elif question and ask_question_func:
         with st.spinner("Searching resume and generating answer..."):
             response = ask_question_func(question)
             st.markdown(f"**Q:** {question}")
             st.markdown(f"<div style='background-color:#1e1e1e; padding:16px; border-radius:8px; border-left:5px solid {st.get_option('theme.primaryColor') or '#380202'}'>{response}</div>", unsafe_allow_html=True)
 
     with st.expander("💡 Example Questions"):
-        examples = [
-            "What is the candidate's most recent role and key achievements?",
-            "How many years of experience do they have in Python?",
-            "Does the candidate have experience with cloud platforms?",
-            "What projects demonstrate leadership or teamwork?",
-            "Summarize the candidate's education background."
-        ]
-        for ex in examples:
+        for ex in EXAMPLE_QUESTIONS:
             if st.button(ex, key=f"ex_{hash(ex)}"):
                 st.text_input("Your Question:", value=ex, key=f"input_{hash(ex)}")
 
+        if ask_questions_func and st.button("Answer All Example Questions", type="primary"):
+            with st.spinner("Answering all example questions..."):
+                answers = ask_questions_func(EXAMPLE_QUESTIONS)
+            for ex, answer in zip(EXAMPLE_QUESTIONS, answers):
+                st.markdown(f"**Q:** {ex}")
+                st.markdown(answer)
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -412,7 +445,7 @@ def resume_improvement_section(has_resume, improve_resume_func=None):
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-def improved_resume_section(has_resume, get_improved_resume_func=None):
+def improved_resume_section(has_resume, get_improved_resume_func=None, stream_improved_resume_func=None):
     if not has_resume:
         st.warning("Please analyze a resume first.")
         return
@@ -428,22 +461,31 @@ def improved_resume_section(has_resume, get_improved_resume_func=None):
     )
 
     if st.button("Generate Improved Resume", type="primary"):
-        if get_improved_resume_func:
+        if stream_improved_resume_func:
+            st.markdown("### 🏆 Your Enhanced Resume")
+            with st.container(height=600, border=True):
+                improved = st.write_stream(stream_improved_resume_func(target_role, highlight_skills))
+            if not isinstance(improved, str):
+                improved = "".join(str(part) for part in improved)
+        elif get_improved_resume_func:
             with st.spinner("Rewriting and optimizing your resume..."):
                 improved = get_improved_resume_func(target_role, highlight_skills)
-                st.markdown("### 🏆 Your Enhanced Resume")
-                st.text_area("", improved, height=600)
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    txt_b64 = base64.b64encode(improved.encode()).decode()
-                    href_txt = f'<a class="download-btn" href="data:text/plain;base64,{txt_b64}" download="Improved_Resume.txt">📄 Download as TXT</a>'
-                    st.markdown(href_txt, unsafe_allow_html=True)
-                with col2:
-                    md_content = f"# {target_role or 'Professional'} Resume\n\n{improved}\n\n---\n*Enhanced by AI Recruitment Agent*"
-                    md_b64 = base64.b64encode(md_content.encode()).decode()
-                    href_md = f'<a class="download-btn" href="data:text/markdown;base64,{md_b64}" download="Improved_Resume.md">📝 Download as Markdown</a>'
-                    st.markdown(href_md, unsafe_allow_html=True)
+            st.markdown("### 🏆 Your Enhanced Resume")
+            st.text_area("", improved, height=600)
+        else:
+            improved = None
+
+        if improved:
+            col1, col2 = st.columns(2)
+            with col1:
+                txt_b64 = base64.b64encode(improved.encode()).decode()
+                href_txt = f'<a class="download-btn" href="data:text/plain;base64,{txt_b64}" download="Improved_Resume.txt">📄 Download as TXT</a>'
+                st.markdown(href_txt, unsafe_allow_html=True)
+            with col2:
+                md_content = f"# {target_role or 'Professional'} Resume\n\n{improved}\n\n---\n*Enhanced by AI Recruitment Agent*"
+                md_b64 = base64.b64encode(md_content.encode()).decode()
+                href_md = f'<a class="download-btn" href="data:text/markdown;base64,{md_b64}" download="Improved_Resume.md">📝 Download as Markdown</a>'
+                st.markdown(href_md, unsafe_allow_html=True)
 
     st.markdown('</div>', unsafe_allow_html=True)
 